@@ -0,0 +1,92 @@
+from calendar import month_name
+from typing import NamedTuple, Optional
+from sqlalchemy import func
+from models import db, Events, Event_Type, MonthlyRollup
+
+MONTHS = list(month_name)[1:]
+
+
+class Analytics(NamedTuple):
+    """Aggregates shown on the dashboard, the report page and /api/v1/attendance."""
+    months: list            # "January" .. "December"
+    attendance: list        # attendance per month, 12 entries
+    events: list            # event count per month, 12 entries
+    growth: list            # % change in events vs the previous month with events
+    attendance_total: Optional[int]
+    event_total: int
+    categories: list        # [{"category", "count", "percentage"}] per event type
+    popular_month: Optional[int]  # month number with the highest attendance
+
+
+def growth_rates(counts):
+    """Percent change of each count over the one before it (0 for the first / after a 0)."""
+    growth = []
+    for i, curr in enumerate(counts):
+        prev = counts[i - 1] if i else 0
+        growth.append(round((curr - prev) / prev * 100, 2) if prev else 0)
+    return growth
+
+
+def compute(year=None):
+    """
+    Every monthly and per-category aggregate from one grouped scan of the
+    rollup table (month x event type), folded into an Analytics in Python.
+    """
+    q = (
+        db.session.query(
+            MonthlyRollup.month,
+            Event_Type.name,
+            func.sum(MonthlyRollup.event_count),
+            func.sum(MonthlyRollup.attendance_sum),
+        )
+        .outerjoin(Event_Type, Event_Type.id == MonthlyRollup.type_id)
+        .group_by(MonthlyRollup.month, MonthlyRollup.type_id, Event_Type.name)
+    )
+    if year:
+        q = q.filter(MonthlyRollup.year == year)
+
+    by_month = {}
+    by_category = {}
+    for month, category, count, attendance in q:
+        month_count, month_attendance = by_month.get(month, (0, 0))
+        by_month[month] = (month_count + count, month_attendance + (attendance or 0))
+        if category is not None:
+            by_category[category] = by_category.get(category, 0) + count
+
+    present = sorted(by_month)
+    growth = dict(zip(present, growth_rates([by_month[m][0] for m in present])))
+    category_total = sum(by_category.values())
+
+    return Analytics(
+        months=MONTHS,
+        attendance=[by_month.get(m, (0, 0))[1] for m in range(1, 13)],
+        events=[by_month.get(m, (0, 0))[0] for m in range(1, 13)],
+        growth=[growth.get(m, 0) for m in range(1, 13)],
+        attendance_total=sum(a for _, a in by_month.values()) if by_month else None,
+        event_total=sum(c for c, _ in by_month.values()),
+        categories=[
+            {
+                "category": name,
+                "count": count,
+                "percentage": round(count / category_total * 100, 2) if category_total else 0,
+            }
+            for name, count in sorted(by_category.items())
+        ],
+        popular_month=max(present, key=lambda m: by_month[m][1], default=None),
+    )
+
+
+def top_events(limit=4):
+    """The best-attended events with their type, for the dashboard suggestions."""
+    return (
+        db.session.query(
+            Events.id,
+            Events.date,
+            Event_Type.name.label('category'),
+            Events.attendance
+        )
+        .join(Event_Type, Events.type_id == Event_Type.id)
+        .order_by(Events.attendance.desc())
+        .limit(limit)
+        .all()
+    )
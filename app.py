@@ -1,12 +1,17 @@
+import startup_profile
+startup_profile.install()
+
 from flask import Flask
-import cloudinary
-import cloudinary.uploader
 from flask_login import LoginManager
-from models import db, Events, User
-from load_data import load_events
+from models import db, User
+from ingest import start_background_ingest
 from views import main_blueprint
 from auth import auth_blueprint, init_oauth
-from report_gen import reports_bp
+from report_gen import reports_bp, init_report_jobs, init_report_hits
+from commands import register_commands
+from migrations import upgrade_schema
+from cache import init_cache
+from uploads import init_uploads
 import os
 import json
 from dotenv import load_dotenv
@@ -16,8 +21,9 @@ print("Loaded TABS:", os.getenv("GOOGLE_SHEETS_TABS"))
 
 login_manager = LoginManager()
 
-def create_app(testing = False):
-    app = Flask(__name__, static_folder='static', template_folder='templates')
+def create_app(testing = False, instance_path=None):
+    # instance_path: where lock files, spooled uploads and reports live (tests pass a tmp dir)
+    app = Flask(__name__, static_folder='static', template_folder='templates', instance_path=instance_path)
     app.config['SECRET_KEY'] = 'dev'
     db_url = os.environ.get('DATABASE_URL')
 
@@ -39,14 +45,47 @@ def create_app(testing = False):
         app.config["GOOGLE_SHEETS_CREDENTIALS"] = None    
     app.config["GOOGLE_SHEETS_SHEET_ID"] = os.environ.get("GOOGLE_SHEETS_SHEET_ID")
     app.config["GOOGLE_SHEETS_TABS"] = os.environ.get("GOOGLE_SHEETS_TABS")
+    # Directory of <tab>.json files that replaces the Sheets API (offline runs)
+    app.config["GOOGLE_SHEETS_FIXTURES"] = os.environ.get("GOOGLE_SHEETS_FIXTURES")
+    # Directory, glob or file used when Sheets is not configured (default: data/)
+    app.config["EVENTS_CSV_SOURCE"] = os.environ.get("EVENTS_CSV_SOURCE")
+    # Rows per page on the events table
+    app.config["EVENTS_PAGE_SIZE"] = int(os.environ.get("EVENTS_PAGE_SIZE", "50"))
+    # In-process cache for the read-only analytics endpoints (see cache.py)
+    app.config["RESPONSE_CACHE_SIZE"] = int(os.environ.get("RESPONSE_CACHE_SIZE", "256"))
+    app.config["RESPONSE_CACHE_TTL"] = int(os.environ.get("RESPONSE_CACHE_TTL", "300"))
+    # Seconds between reads of the shared data_version row (0: every request)
+    app.config["DATA_VERSION_CHECK_INTERVAL"] = float(os.environ.get("DATA_VERSION_CHECK_INTERVAL", "0"))
+    init_cache(app)
     
-    # Cloudinary config
-    cloudinary.config(
-        cloud_name = os.getenv('CLOUDINARY_CLOUD_NAME'),
-        cloud_key = os.getenv('CLOUDINARY_API_KEY'),
-        cloud_secret = os.getenv('CLOUDINARY_API_SECRET')
-    )
-    db.init_app(app)
+    # Cloudinary config (applied on first upload, see uploads.cloudinary_uploader)
+    app.config["CLOUDINARY_CLOUD_NAME"] = os.getenv('CLOUDINARY_CLOUD_NAME')
+    app.config["CLOUDINARY_API_KEY"] = os.getenv('CLOUDINARY_API_KEY')
+    app.config["CLOUDINARY_API_SECRET"] = os.getenv('CLOUDINARY_API_SECRET')
+    # "cloudinary" or "local" (<instance>/posters); default: cloudinary when configured
+    app.config["POSTER_BACKEND"] = os.getenv("POSTER_BACKEND")
+    app.config["POSTER_UPLOAD_WORKERS"] = int(os.getenv("POSTER_UPLOAD_WORKERS", "2"))
+    app.config["POSTER_UPLOAD_MAX_PENDING"] = int(os.getenv("POSTER_UPLOAD_MAX_PENDING", "32"))
+    # Retries per failed upload; the wait starts at POSTER_UPLOAD_BACKOFF seconds and doubles
+    app.config["POSTER_UPLOAD_RETRIES"] = int(os.getenv("POSTER_UPLOAD_RETRIES", "3"))
+    app.config["POSTER_UPLOAD_BACKOFF"] = float(os.getenv("POSTER_UPLOAD_BACKOFF", "1"))
+    init_uploads(app)
+
+    # Threads rendering queued reports (POST /api/reports/jobs)
+    app.config["REPORT_WORKERS"] = int(os.getenv("REPORT_WORKERS", "2"))
+    # Seconds after which a queued/running job is treated as orphaned and queued again
+    app.config["REPORT_JOB_TIMEOUT"] = int(os.getenv("REPORT_JOB_TIMEOUT", "600"))
+    # Retention for <instance>/reports, enforced after each new report (0 = no limit)
+    app.config["REPORT_MAX_COUNT"] = int(os.getenv("REPORT_MAX_COUNT", "200"))
+    app.config["REPORT_MAX_BYTES"] = int(os.getenv("REPORT_MAX_BYTES", str(500 * 1024 * 1024)))
+    app.config["REPORT_MAX_AGE_DAYS"] = int(os.getenv("REPORT_MAX_AGE_DAYS", "30"))
+    init_report_jobs(app)
+    # Report hit counts are written to report_files at most this often (seconds)
+    app.config["REPORT_HIT_FLUSH_INTERVAL"] = int(os.getenv("REPORT_HIT_FLUSH_INTERVAL", "60"))
+    init_report_hits(app)
+
+    with startup_profile.phase("db.init_app"):
+        db.init_app(app)
 
     login_manager.init_app(app)
     login_manager.login_view = 'auth.signIn'
@@ -61,21 +100,32 @@ def create_app(testing = False):
     init_oauth(app)
 
     # Register blueprints
-    app.register_blueprint(main_blueprint)
-    app.register_blueprint(auth_blueprint)
-    app.register_blueprint(reports_bp, url_prefix="/api/reports")
+    with startup_profile.phase("register blueprints"):
+        app.register_blueprint(main_blueprint)
+        app.register_blueprint(auth_blueprint)
+        app.register_blueprint(reports_bp, url_prefix="/api/reports")
+        register_commands(app)
     
 
-    with app.app_context():
-        db.create_all()
-        if Events.query.count() == 0:
-            if not testing:
-                load_events()
-        else:
-            print("Data already loaded - skipping csv import")
-
     # Ensure reports folder exists
     os.makedirs(os.path.join(app.instance_path, "reports"), exist_ok=True)
+
+    with startup_profile.phase("db.create_all"), app.app_context():
+        db.create_all()
+        upgrade_schema()
+
+    # Posters spooled before a crash/restart or whose upload kept failing
+    if not testing:
+        app.extensions["poster_uploader"].resume_spooled()
+
+    # First boot on an empty DB: import in the background (one worker wins the
+    # lock, the rest skip) so workers start serving immediately. Otherwise use
+    # `flask --app app load-events` / `sync-events`. Progress: /api/v1/ingest/status
+    app.config["INGEST_ON_STARTUP"] = os.environ.get("INGEST_ON_STARTUP", "1") == "1"
+    if not testing and app.config["INGEST_ON_STARTUP"]:
+        start_background_ingest(app, only_if_empty=True)
+
+    startup_profile.report()
     print("GOOGLE_CLIENT_SECRET:", os.getenv("GOOGLE_CLIENT_SECRET"))
 
     return app
\ No newline at end of file
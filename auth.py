@@ -3,7 +3,6 @@ from flask import (
     request, flash, current_app
 )
 from flask_login import login_user, logout_user, login_required, current_user
-from authlib.integrations.flask_client import OAuth
 from models import db, User
 import os
 from dotenv import load_dotenv
@@ -11,17 +10,48 @@ from dotenv import load_dotenv
 # Blueprint
 auth_blueprint = Blueprint('auth', __name__, url_prefix="/auth")
 
+
+class LazyOAuth:
+    """
+    Stand-in for authlib's OAuth registry. Importing authlib (and the JOSE /
+    cryptography stack behind it) is slow and only the Google sign-in routes
+    need it, so the real registry is built on first attribute access.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._oauth = None
+
+    def init_app(self, app):
+        self._app = app
+        self._oauth = None
+
+    def _load(self):
+        if self._oauth is None:
+            from authlib.integrations.flask_client import OAuth
+            self._oauth = OAuth()
+            register_google(self._oauth, self._app)
+        return self._oauth
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+
 # Single global OAuth registry used everywhere
-oauth = OAuth()
+oauth = LazyOAuth()
 load_dotenv()
 
 def init_oauth(app):
-    """Attach OAuth to app and register the Google client."""
+    """Attach OAuth to app; the Google client is registered on first use."""
     oauth.init_app(app)
 
     print("DEBUG GOOGLE_CLIENT_ID =", app.config.get("GOOGLE_CLIENT_ID"))
 
-    oauth.register(
+
+def register_google(registry, app):
+    """Register the Google client on an authlib OAuth registry."""
+    registry.init_app(app)
+    registry.register(
         name="google",
         client_id=app.config.get("GOOGLE_CLIENT_ID"),
         client_secret=app.config.get("GOOGLE_CLIENT_SECRET"),
@@ -0,0 +1,105 @@
+"""
+Micro-benchmark for the load_data date/time parsers.
+
+Compares the cached fast-path parsers against the original strptime
+implementation (kept below as the reference) on every Date / Start Time /
+End Time cell in data/*.csv, after checking both return identical results.
+
+    python benchmarks/bench_parsers.py [--repeat 200]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_data import DATA_DIR, iter_csv_rows, parse_flexible_date, parse_time  # noqa: E402
+
+# Odd cells the data files don't contain but the parsers must agree on
+EXTRA_DATES = ["Nov 6-7 2024", "30-Feb-24", "07-Nov-23", "november 6, 2024", "Recurring", "2024", ""]
+EXTRA_TIMES = ["12am", "12pm", "0pm", "3:75pm", "3 pm", "03:05PM", "8.30pm", "Various", ""]
+
+
+def legacy_parse_time(tstr):
+    if not tstr:
+        return None
+    tstr = tstr.strip().lower().replace('.', ':')
+    if ':' not in tstr[:-2]:
+        tstr = tstr[:-2] + ':00' + tstr[-2:]
+    try:
+        return datetime.strptime(tstr, "%I:%M%p").time()
+    except ValueError:
+        return None
+
+
+def legacy_parse_flexible_date(value):
+    if not value:
+        return None
+    v = value.strip()
+    try:
+        return datetime.strptime(v, "%d-%b-%y").date()
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(v, "%B %d, %Y").date()
+    except ValueError:
+        pass
+    m = re.search(r"([A-Za-z]+)\s+(\d+)", v)
+    y = re.search(r"(\d{4})", v)
+    if m and y:
+        try:
+            return datetime.strptime(f"{m.group(1)} {m.group(2)} {y.group(1)}", "%B %d %Y").date()
+        except ValueError:
+            pass
+    return None
+
+
+def collect_cells():
+    dates, times = list(EXTRA_DATES), list(EXTRA_TIMES)
+    for row in iter_csv_rows(DATA_DIR):
+        dates.append(row.get("Date"))
+        times.extend([row.get("Start Time"), row.get("End Time")])
+    return dates, times
+
+
+def check_equivalence(dates, times):
+    for d in dates:
+        assert parse_flexible_date(d) == legacy_parse_flexible_date(d), d
+    for t in times:
+        assert parse_time(t) == legacy_parse_time(t), t
+
+
+def rows_per_second(parse_date, parse_tm, dates, times, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for d, t1, t2 in zip(dates, times[0::2], times[1::2]):
+            parse_date(d)
+            parse_tm(t1)
+            parse_tm(t2)
+    elapsed = time.perf_counter() - start
+    return repeat * min(len(dates), len(times) // 2) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    dates, times = collect_cells()
+    check_equivalence(dates, times)
+    print(f"{len(dates)} date cells and {len(times)} time cells parse identically")
+
+    before = rows_per_second(legacy_parse_flexible_date, legacy_parse_time, dates, times, args.repeat)
+    after = rows_per_second(parse_flexible_date, parse_time, dates, times, args.repeat)
+    uncached = rows_per_second(parse_flexible_date.__wrapped__, parse_time.__wrapped__, dates, times, args.repeat)
+
+    print(f"before (strptime):      {before:12,.0f} rows/sec")
+    print(f"after (uncached):       {uncached:12,.0f} rows/sec  ({uncached / before:.1f}x)")
+    print(f"after (cached):         {after:12,.0f} rows/sec  ({after / before:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
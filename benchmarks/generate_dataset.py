@@ -0,0 +1,116 @@
+"""
+Generate a synthetic, sheet-shaped events CSV at any scale.
+
+Rows use the same columns as data/SW_Events.csv and the same messy cell
+formats the loader has to cope with: several date styles (25-Jul-24,
+November 6, 2024, date ranges, "Recurring"), 3pm / 8:30pm / 8.30pm times,
+comma- and semicolon-separated lists, "None" cells and blank rows.
+
+    python benchmarks/generate_dataset.py --rows 100000 --out /tmp/events_100k.csv
+"""
+import argparse
+import calendar
+import csv
+import os
+import random
+
+HEADER = [
+    "Name of Event/Activity", "Lead Organizer", "Date", "Start Time", "End Time",
+    "Length (Hours)", "Location", "Attendance", "Partners", "Advertisement",
+    "Posters", "Instagram Post", "ColbyNow", "EventType",
+]
+
+TITLES = [
+    "Wellness Fair", "Stressbusters", "Flu Vaccine Clinic", "Mindful Mondays",
+    "Sleep Workshop", "Financial Mindfulness", "Yoga in the Arboretum",
+    "Nutrition Talk", "Study Break", "Healthy Relationships Discussion",
+]
+ORGANIZERS = ["SW", "SHOC", "CER", "HR", "Pugh Center", "MaineGeneral", "Spiritual Life", "Art Museum"]
+PARTNERS = ["Red Cross", "MaineGeneral", "Oakland Pharmacy", "Outdoor Education", "CCAK", "Dean of Studies"]
+LOCATIONS = ["Page Commons", "Pugh Center", "Chace Forum", "Diamond 145", "Ostrove Auditorium", "Spa", "Virtual"]
+ADVERTS = ["Posters", "Instagram Post", "ColbyNow"]
+TYPES = ["Wellness", "Workshop", "Discussion", "Presentation"]
+
+
+def _date_cell(rng, year):
+    month = rng.randint(1, 12)
+    day = rng.randint(1, 28)
+    style = rng.random()
+    if style < 0.85:
+        return f"{day}-{calendar.month_abbr[month]}-{year % 100:02d}"
+    if style < 0.95:
+        return f"{calendar.month_name[month]} {day}, {year}"
+    if style < 0.99:
+        return f"{calendar.month_name[month]} {day}-{day + 1}, {year}"
+    return "Recurring"
+
+
+def _time_cell(rng, hour, minute):
+    suffix = "am" if hour < 12 else "pm"
+    h12 = hour % 12 or 12
+    if minute == 0:
+        return f"{h12}{suffix}"
+    sep = "." if rng.random() < 0.1 else ":"
+    return f"{h12}{sep}{minute:02d}{suffix}"
+
+
+def _list_cell(rng, choices, max_items, sep=", ", allow_none=True):
+    if allow_none and rng.random() < 0.2:
+        return "None"
+    return sep.join(rng.sample(choices, rng.randint(1, max_items)))
+
+
+def generate_rows(count, seed=0, start_year=2015, years=10):
+    """Yield `count` synthetic row dicts (lazily, so any scale fits in memory)."""
+    rng = random.Random(seed)
+    for i in range(count):
+        if rng.random() < 0.01:
+            yield dict.fromkeys(HEADER, "")  # blank spreadsheet row
+            continue
+
+        start = rng.randint(8, 19)
+        minute = rng.choice([0, 0, 0, 30])
+        length = rng.choice([1, 1.5, 2, 3])
+        end_total = start * 60 + minute + int(length * 60)
+
+        yield {
+            "Name of Event/Activity": f"{rng.choice(TITLES)} #{i}",
+            "Lead Organizer": _list_cell(rng, ORGANIZERS, 2, allow_none=False),
+            "Date": _date_cell(rng, start_year + rng.randrange(years)),
+            "Start Time": _time_cell(rng, start, minute) if rng.random() > 0.01 else "Various",
+            "End Time": _time_cell(rng, min(end_total // 60, 23), end_total % 60),
+            "Length (Hours)": str(length),
+            "Location": rng.choice(LOCATIONS),
+            "Attendance": str(rng.randint(0, 500)) if rng.random() > 0.1 else "",
+            "Partners": _list_cell(rng, PARTNERS, 2, sep=rng.choice([", ", "; "])),
+            "Advertisement": _list_cell(rng, ADVERTS, 3),
+            "Posters": rng.choice(["TRUE", "FALSE"]),
+            "Instagram Post": rng.choice(["TRUE", "FALSE"]),
+            "ColbyNow": rng.choice(["TRUE", "FALSE"]),
+            "EventType": rng.choice(TYPES),
+        }
+
+
+def write_csv(path, count, seed=0):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=HEADER)
+        writer.writeheader()
+        writer.writerows(generate_rows(count, seed=seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=None, help="CSV path (default: benchmarks/output/events_<rows>.csv)")
+    args = parser.parse_args()
+
+    out = args.out or os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", f"events_{args.rows}.csv")
+    write_csv(out, args.rows, seed=args.seed)
+    print(f"Wrote {args.rows} rows to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Ingestion and endpoint benchmark against a throwaway local SQLite DB.
+
+Generates a synthetic dataset, times load_events() over it, then times the
+main read endpoints through the Flask test client, both cold (data version
+bumped before each request, so the response cache and saved reports are
+bypassed and the queries run) and warm (served from cache). Results can be saved as
+a named baseline (benchmarks/baselines/<name>.json) and later runs are
+compared against it; the exit code is 1 if anything regressed by more than
+--tolerance.
+
+    python benchmarks/run_benchmarks.py --rows 10000 --save-baseline
+    python benchmarks/run_benchmarks.py --rows 10000          # compare
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from generate_dataset import write_csv  # noqa: E402
+
+BASELINE_DIR = os.path.join(BENCH_DIR, "baselines")
+
+ENDPOINTS = [
+    "/api/v1/dashboard",
+    "/api/v1/events",
+    "/report",
+    "/api/v1/attendance",
+    "/api/v1/attendance?year=2020",
+    "/api/events/years",
+    "/api/reports/generate?year=2020",
+]
+
+
+def build_app(workdir):
+    # DATABASE_URL is read inside create_app, so set it before importing
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    from app import create_app
+
+    app = create_app(testing=True, instance_path=workdir)
+    return app
+
+
+def bench_ingest(app, csv_path):
+    from load_data import iter_csv_rows, load_events
+
+    with app.app_context():
+        start = time.perf_counter()
+        loaded = load_events(rows=iter_csv_rows(csv_path))
+        elapsed = time.perf_counter() - start
+    return {"rows_loaded": loaded, "seconds": round(elapsed, 3), "rows_per_sec": round(loaded / elapsed, 1)}
+
+
+def invalidate_caches(app):
+    """Bump the data version, as a write would: every cached response and saved report goes stale."""
+    from cache import bump_data_version
+    from models import db
+
+    with app.app_context():
+        bump_data_version()
+        db.session.commit()
+
+
+def time_requests(client, url, repeat, before=None):
+    timings = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        response = client.get(url)
+        timings.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 2),
+        "max_ms": round(max(timings) * 1000, 2),
+    }
+
+
+def bench_endpoints(app, repeat):
+    client = app.test_client()
+    client.post(
+        "/auth/api/v1/auth/signup",
+        data={"name": "Bench", "email": "bench@colby.edu", "password": "bench"},
+    )
+
+    results = {}
+    for url in ENDPOINTS:
+        results[url] = {
+            "cold": time_requests(client, url, repeat, before=lambda: invalidate_caches(app)),
+            "warm": time_requests(client, url, repeat),
+        }
+    return results
+
+
+def compare(current, baseline, tolerance):
+    """Return human-readable regressions of `current` against `baseline`."""
+    regressions = []
+
+    before = baseline["ingest"]["rows_per_sec"]
+    after = current["ingest"]["rows_per_sec"]
+    if after < before * (1 - tolerance):
+        regressions.append(f"ingest: {after:.0f} rows/sec vs baseline {before:.0f}")
+
+    for url, runs in current["endpoints"].items():
+        for kind, stats in runs.items():
+            old = baseline["endpoints"].get(url, {}).get(kind)
+            if old and stats["median_ms"] > old["median_ms"] * (1 + tolerance):
+                regressions.append(f"{url} ({kind}): {stats['median_ms']}ms vs baseline {old['median_ms']}ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="requests per endpoint")
+    parser.add_argument("--baseline", default=None, help="baseline name (default: rows_<rows>)")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    name = args.baseline or f"rows_{args.rows}"
+    baseline_path = os.path.join(BASELINE_DIR, f"{name}.json")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = write_csv(os.path.join(workdir, "events.csv"), args.rows, seed=args.seed)
+        app = build_app(workdir)
+        results = {
+            "rows": args.rows,
+            "ingest": bench_ingest(app, csv_path),
+            "endpoints": bench_endpoints(app, args.repeat),
+        }
+
+    print(json.dumps(results, indent=2))
+
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline {baseline_path}")
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --save-baseline first")
+        return 0
+
+    with open(baseline_path, encoding="utf-8") as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
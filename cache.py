@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from flask import current_app, has_app_context, has_request_context, make_response, request
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+from werkzeug.http import is_resource_modified
+from db_helpers import insert_ignore
+from models import db, DataVersion
+
+# The single DataVersion row
+DATA_VERSION_ID = 1
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of rendered responses. Entries are keyed by the data
+    version, so bump_data_version() makes every older entry unreachable
+    (they age out of the LRU) and a stale response is never served.
+    """
+
+    def __init__(self, max_entries=256, ttl=300, check_interval=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.version = 0
+        self.updated_at = None
+        self.checked_at = None
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def current_version(self):
+        """
+        The shared data version, re-read from the DataVersion row at most
+        every check_interval seconds (0: on every call).
+        """
+        now = time.monotonic()
+        if self.checked_at is None or now - self.checked_at >= self.check_interval:
+            row = db.session.execute(
+                select(DataVersion.version, DataVersion.updated_at).where(DataVersion.id == DATA_VERSION_ID)
+            ).first()
+            self.version, self.updated_at = row if row else (0, None)
+            self.checked_at = now
+        return self.version
+
+    def invalidate_version(self):
+        """Force the next current_version() to read the database."""
+        self.checked_at = None
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def init_cache(app):
+    app.extensions["response_cache"] = ResponseCache(
+        max_entries=app.config.get("RESPONSE_CACHE_SIZE", 256),
+        ttl=app.config.get("RESPONSE_CACHE_TTL", 300),
+        check_interval=app.config.get("DATA_VERSION_CHECK_INTERVAL", 0),
+    )
+
+
+def get_cache():
+    return current_app.extensions.get("response_cache")
+
+
+def data_version():
+    """The shared data version, read at most once per request."""
+    cache = get_cache()
+    if cache is None:
+        return 0
+    if not has_request_context():
+        return cache.current_version()
+    if "events.data_version" not in request.environ:
+        request.environ["events.data_version"] = cache.current_version()
+    return request.environ["events.data_version"]
+
+
+def bump_data_version():
+    """
+    Increment the shared DataVersion row inside the caller's transaction
+    (call it before committing a change to events). Once that commit lands,
+    every worker's next version check sees the new number and stops serving
+    older cached responses.
+    """
+    now = datetime.utcnow()
+    bump = (
+        update(DataVersion)
+        .where(DataVersion.id == DATA_VERSION_ID)
+        .values(version=DataVersion.version + 1, updated_at=now)
+    )
+    if db.session.execute(bump).rowcount == 0:
+        # No row yet: create it without racing another writer doing the same
+        insert_ignore(DataVersion.__table__, [{"id": DATA_VERSION_ID, "version": 0, "updated_at": now}])
+        db.session.execute(bump)
+    db.session.info["data_version_bumped"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_after_commit(session):
+    # This worker sees its own writes immediately, whatever the check interval
+    if session.info.pop("data_version_bumped", False) and has_app_context():
+        cache = get_cache()
+        if cache:
+            cache.invalidate_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_bump(session):
+    session.info.pop("data_version_bumped", None)
+
+
+def cached(view):
+    """
+    Serve a GET view from the response cache. The key is the endpoint, its
+    URL/query arguments and the current data version; only 200 responses are
+    stored.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = get_cache()
+        if cache is None or request.method != "GET":
+            return view(*args, **kwargs)
+
+        key = (
+            request.endpoint,
+            tuple(sorted(kwargs.items())),
+            tuple(sorted(request.args.items(multi=True))),
+            data_version(),
+        )
+        hit = cache.get(key)
+        if hit is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.direct_passthrough:
+                return response
+            hit = (response.get_data(), response.status_code, list(response.headers.items()))
+            cache.set(key, hit)
+
+        body, status, headers = hit
+        return current_app.response_class(body, status=status, headers=headers)
+
+    return wrapper
+
+
+# -------------------------
+# Conditional GET (ETag / Last-Modified / 304)
+# -------------------------
+def not_modified(etag, last_modified=None):
+    """A 304 response if the request's validators still match, else None."""
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    return set_validators(current_app.response_class(status=304), etag, last_modified)
+
+
+def set_validators(response, etag, last_modified=None):
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    return response
+
+
+def conditional_on_data_version(view):
+    """
+    ETag/Last-Modified from the shared data version: an unchanged poll
+    costs one version check and gets a 304 without running the view.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if get_cache() is None:
+            return view(*args, **kwargs)
+
+        etag = f"v{data_version()}"
+        last_modified = get_cache().updated_at
+        response = not_modified(etag, last_modified)
+        if response is None:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                set_validators(response, etag, last_modified)
+        return response
+
+    return wrapper
@@ -0,0 +1,63 @@
+import click
+from ingest import run_ingest
+from load_data import validate_rows
+from migrations import upgrade_schema
+from rollups import rebuild_rollups
+from report_gen import enforce_retention, index_report_dir
+
+workers_option = click.option(
+    "--workers", type=int, default=None,
+    help="Parse rows in this many processes (default: parse in-process).",
+)
+
+
+def register_commands(app):
+    """Attach the data-management CLI commands (`flask --app app <name>`)."""
+
+    @app.cli.command("load-events")
+    @workers_option
+    @click.option("--dry-run", is_flag=True, help="Only validate rows and report the ones that would be skipped.")
+    def load_events_command(workers, dry_run):
+        """Import every sheet/CSV row into the events table."""
+        if dry_run:
+            validate_rows(workers=workers)
+            return
+        _report(run_ingest(app, mode="load", wait=True, workers=workers))
+
+    @app.cli.command("sync-events")
+    @workers_option
+    @click.option("--prune", is_flag=True, help="Delete events whose source row is gone (title, date and start time identify a row).")
+    def sync_events_command(workers, prune):
+        """Add new, update changed and report vanished sheet/CSV rows."""
+        _report(run_ingest(app, mode="sync", wait=True, prune=prune, workers=workers))
+
+
+    @app.cli.command("upgrade-db")
+    def upgrade_db_command():
+        """Add new columns/indexes to an existing database and backfill them."""
+        upgrade_schema()
+        click.echo("Database schema is up to date")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups_command():
+        """Recompute the monthly event/attendance rollup from the events table."""
+        rebuild_rollups()
+        click.echo("Monthly rollups rebuilt")
+
+    @app.cli.command("prune-reports")
+    @click.option("--max-count", type=int, default=None, help="Keep at most this many reports.")
+    @click.option("--max-bytes", type=int, default=None, help="Keep at most this many bytes of reports.")
+    @click.option("--max-age-days", type=int, default=None, help="Delete reports older than this.")
+    def prune_reports_command(max_count, max_bytes, max_age_days):
+        """Index untracked saved reports, then apply the retention policy."""
+        added, missing = index_report_dir()
+        evicted = enforce_retention(max_count, max_bytes, max_age_days)
+        click.echo(f"Reports indexed: {added} added, {missing} missing; {len(evicted)} evicted")
+
+
+def _report(run):
+    if run is None:
+        raise click.ClickException("Import skipped: another import is running")
+    if run.status == "failed":
+        raise click.ClickException(f"Import failed: {run.error}")
+    click.echo(f"Import {run.id} finished: {run.rows_loaded} events written")
@@ -0,0 +1,64 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite, mysql
+from models import db
+
+# Keep multi-VALUES statements under SQLite's older 999 bound-parameter limit
+MAX_PARAMS = 900
+
+
+def dialect_name():
+    return db.session.get_bind().dialect.name
+
+
+def insert_ignore_stmt(table, rows, dialect):
+    """
+    Multi-VALUES INSERT for `rows` that silently skips rows hitting a
+    primary-key/unique conflict, in the syntax `dialect` understands.
+    """
+    if dialect == "postgresql":
+        return postgresql.insert(table).values(rows).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return insert(table).values(rows).prefix_with("OR IGNORE")
+    if dialect in ("mysql", "mariadb"):
+        return insert(table).values(rows).prefix_with("IGNORE")
+    raise NotImplementedError(f"insert_ignore does not support the {dialect} dialect")
+
+
+def insert_ignore(table, rows):
+    """Insert every row of `rows` (list of dicts), ignoring duplicates. Returns the number inserted."""
+    if not rows:
+        return 0
+    dialect = dialect_name()
+    chunk_size = max(1, MAX_PARAMS // len(rows[0]))
+    inserted = 0
+    for i in range(0, len(rows), chunk_size):
+        inserted += db.session.execute(insert_ignore_stmt(table, rows[i:i + chunk_size], dialect)).rowcount
+    return inserted
+
+
+def upsert_add_stmt(table, rows, key_columns, add_columns, dialect):
+    """
+    Multi-VALUES INSERT that, for rows whose `key_columns` already exist,
+    adds the new values onto `add_columns` instead (col = col + new).
+    """
+    if dialect in ("postgresql", "sqlite"):
+        module = postgresql if dialect == "postgresql" else sqlite
+        stmt = module.insert(table).values(rows)
+        return stmt.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={c: table.c[c] + stmt.excluded[c] for c in add_columns},
+        )
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table).values(rows)
+        return stmt.on_duplicate_key_update({c: table.c[c] + stmt.inserted[c] for c in add_columns})
+    raise NotImplementedError(f"upsert_add does not support the {dialect} dialect")
+
+
+def upsert_add(table, rows, key_columns, add_columns):
+    """Insert-or-increment every row of `rows` (list of dicts)."""
+    if not rows:
+        return
+    dialect = dialect_name()
+    chunk_size = max(1, MAX_PARAMS // len(rows[0]))
+    for i in range(0, len(rows), chunk_size):
+        db.session.execute(upsert_add_stmt(table, rows[i:i + chunk_size], key_columns, add_columns, dialect))
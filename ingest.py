@@ -0,0 +1,101 @@
+import threading
+import traceback
+from datetime import datetime
+from models import db, Events, IngestRun
+from load_data import load_events, sync_events
+from locks import InstanceLock
+
+
+class IngestLock(InstanceLock):
+    """The lock held for the whole of an import."""
+
+    def __init__(self, instance_path):
+        super().__init__(instance_path, "ingest.lock")
+
+
+def run_ingest(app, mode="load", only_if_empty=False, wait=False, **kwargs):
+    """
+    Run a load/sync under the ingest lock, recording progress in an
+    IngestRun row. Returns the run, or None if another worker holds the
+    lock (and wait is False) or, with only_if_empty, the events table
+    already has data. An import interrupted by a worker exiting is finished
+    with a sync, even with only_if_empty.
+    """
+    lock = IngestLock(app.instance_path)
+    if not lock.acquire(wait=wait):
+        print("Another worker is already importing events - skipping")
+        return None
+
+    try:
+        with app.app_context():
+            interrupted = fail_interrupted_runs()
+            if interrupted:
+                print(f"Resuming {interrupted} interrupted import(s) with a sync")
+                mode = "sync"
+            elif only_if_empty and db.session.query(Events.id).first():
+                print("Data already loaded - skipping csv import")
+                return None
+
+            run = IngestRun(mode=mode, status="running")
+            db.session.add(run)
+            db.session.commit()
+            run_id = run.id
+
+            def progress(count):
+                db.session.query(IngestRun).filter_by(id=run_id).update({"rows_loaded": count})
+                db.session.commit()
+
+            try:
+                if mode == "sync":
+                    stats = sync_events(progress=progress, **kwargs)
+                    count = stats["added"] + stats["updated"]
+                else:
+                    count = load_events(progress=progress, **kwargs)
+            except Exception as e:
+                db.session.rollback()
+                traceback.print_exc()
+                run = db.session.get(IngestRun, run_id)
+                run.status = "failed"
+                run.error = str(e)
+            else:
+                run = db.session.get(IngestRun, run_id)
+                run.status = "done"
+                run.rows_loaded = count
+
+            run.finished_at = datetime.utcnow()
+            db.session.commit()
+            db.session.refresh(run)
+            db.session.expunge(run)
+            return run
+    finally:
+        lock.release()
+
+
+def fail_interrupted_runs():
+    """
+    Mark runs still "running" as failed. Call with the ingest lock held:
+    the lock is released when its holder exits, so any such run belongs to
+    a worker that died mid-import. Returns how many there were.
+    """
+    count = (
+        db.session.query(IngestRun)
+        .filter_by(status="running")
+        .update({
+            "status": "failed",
+            "error": "interrupted: the worker exited before the import finished",
+            "finished_at": datetime.utcnow(),
+        })
+    )
+    db.session.commit()
+    return count
+
+
+def start_background_ingest(app, **kwargs):
+    """Run run_ingest on a daemon thread so the worker can serve requests right away."""
+    thread = threading.Thread(target=run_ingest, args=(app,), kwargs=kwargs, name="ingest", daemon=True)
+    thread.start()
+    return thread
+
+
+def latest_run():
+    return IngestRun.query.order_by(IngestRun.id.desc()).first()
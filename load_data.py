@@ -1,74 +1,251 @@
+import calendar
 import csv
+import glob
+import hashlib
+import json
 import os
 import re
-from googleapiclient.discovery import build
 from flask import current_app
-from google.oauth2.service_account import Credentials
-from datetime import datetime
-from models import db, Events, Advertisement, Partners, Organizer, Event_Type, event_organizers, event_partners
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, date, time
+from functools import lru_cache
+from itertools import islice
+from typing import NamedTuple, Optional
+from sqlalchemy import insert, update, delete
+from db_helpers import insert_ignore
+from cache import bump_data_version
+from rollups import apply_changes, event_snapshot, snapshots_for
+from models import db, Events, Advertisement, Partners, Organizer, Event_Type, ImportedRow, ProcessedFile, event_organizers, event_partners
+
+# Number of parsed rows written per INSERT/commit during ingestion
+BATCH_SIZE = 500
+# Rows handed to each process-pool worker at a time when parsing in parallel
+PARSE_CHUNKSIZE = 200
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+# Header spellings seen across sheet exports -> canonical column name
+HEADER_ALIASES = {
+    "event type": "EventType",
+    "eventtype": "EventType",
+    "name of event": "Name of Event/Activity",
+    "name of event/activity": "Name of Event/Activity",
+    "lead organizers": "Lead Organizer",
+    "partner": "Partners",
+    "advertisements": "Advertisement",
+}
+
+# Multi-value cells are comma-separated, newer exports use semicolons
+LIST_SEPARATOR = re.compile(r"[,;]")
 
 
 def get_sheet_rows():
-    """Load from Google Sheets if configured. Otherwise fallback to CSV."""
+    """Load every row into a list. Prefer iter_sheet_rows() for ingestion."""
+    return list(iter_sheet_rows())
+
+
+def iter_sheet_rows():
+    """Yield rows from Google Sheets if configured. Otherwise fallback to CSV."""
 
     creds_dict = current_app.config.get("GOOGLE_SHEETS_CREDENTIALS")
     sheet_id = current_app.config.get("GOOGLE_SHEETS_SHEET_ID")
     tabs = current_app.config.get("GOOGLE_SHEETS_TABS")
+    fixtures = current_app.config.get("GOOGLE_SHEETS_FIXTURES")
 
+    if fixtures and tabs:
+        print(f"Sheets fixtures configured — loading tabs from {fixtures}")
+        tab_values = fetch_fixture_tabs(fixtures, split_tabs(tabs))
     # If ANY required Google value is missing → fallback
-    if not creds_dict or not sheet_id or not tabs:
+    elif not creds_dict or not sheet_id or not tabs:
         print("No Google Sheets configuration found — loading from CSV instead.")
-        return load_from_csv()
+        yield from iter_csv_rows(current_app.config.get("EVENTS_CSV_SOURCE"))
+        return
+    else:
+        print("Google Sheets detected — loading remotely")
+        tab_values = fetch_google_tabs(creds_dict, sheet_id, split_tabs(tabs))
+
+    for sheet_name, values in tab_values:
+        if not values:
+            print(f"⚠ No data in sheet: {sheet_name}")
+            continue
+        yield from rows_from_values(values)
 
-    print("Google Sheets detected — loading remotely")
 
-    SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
-    creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+def split_tabs(tabs):
+    return [t.strip() for t in tabs.split(",") if t.strip()]
 
-    service = build("sheets", "v4", credentials=creds)
-    sheet_api = service.spreadsheets()
 
-    tab_list = [t.strip() for t in tabs.split(",")]
-    all_rows = []
+def rows_from_values(values):
+    """
+    Turn a sheet's 2-D value list (header first) into row dicts, mapping
+    headers with normalize_header() exactly as the CSV path does.
+    """
+    names = normalize_header(values[0])
+    width = len(names)
+    for r in values[1:]:
+        if len(r) < width:
+            r = r + [""] * (width - len(r))
+        yield {name: cell for name, cell in zip(names, r) if name}
 
-    for sheet_name in tab_list:
-        result = sheet_api.values().get(
-            spreadsheetId=sheet_id,
-            range=sheet_name
-        ).execute()
 
-        rows = result.get("values", [])
-        if not rows:
-            print(f"⚠ No data in sheet: {sheet_name}")
+# Discovery clients are expensive to build; keep one per service account
+_sheets_services = {}
+
+
+def sheets_service(creds_dict):
+    key = (creds_dict.get("client_email"), creds_dict.get("private_key_id"))
+    if key not in _sheets_services:
+        # Imported here: the Google client libraries are slow to import and
+        # only the import path needs them
+        from googleapiclient.discovery import build
+        from google.oauth2.service_account import Credentials
+
+        SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
+        creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
+        _sheets_services[key] = build("sheets", "v4", credentials=creds, cache_discovery=False)
+    return _sheets_services[key]
+
+
+def fetch_google_tabs(creds_dict, sheet_id, tab_list):
+    """
+    Fetch every tab with a single values.batchGet request and yield
+    (tab name, values) pairs in the order the tabs were listed.
+    """
+    result = sheets_service(creds_dict).spreadsheets().values().batchGet(
+        spreadsheetId=sheet_id,
+        ranges=tab_list
+    ).execute()
+
+    for sheet_name, value_range in zip(tab_list, result.get("valueRanges", [])):
+        yield sheet_name, value_range.get("values", [])
+
+
+def fetch_fixture_tabs(fixture_dir, tab_list):
+    """
+    Offline stand-in for fetch_google_tabs: each tab is read from
+    <fixture_dir>/<tab>.json, holding either a batchGet-style
+    {"values": [...]} object or the bare list of rows.
+    """
+    for sheet_name in tab_list:
+        path = os.path.join(fixture_dir, f"{sheet_name}.json")
+        if not os.path.exists(path):
+            yield sheet_name, []
             continue
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        yield sheet_name, data.get("values", []) if isinstance(data, dict) else data
 
-        headers = rows[0]
-        for r in rows[1:]:
-            row_dict = {headers[i]: r[i] if i < len(r) else "" for i in range(len(headers))}
-            all_rows.append(row_dict)
 
-    return all_rows
+def csv_files(source=None):
+    """
+    Resolve a CSV source to a sorted list of files. `source` may be a
+    directory (all *.csv inside), a glob pattern or a single file;
+    defaults to the bundled data/ directory.
+    """
+    source = source or DATA_DIR
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, "*.csv")))
+    if glob.has_magic(source):
+        return sorted(glob.glob(source))
+    return [source] if os.path.exists(source) else []
 
 
-def load_from_csv():
-    """Load rows from SW_Events.csv for local testing."""
-    # Use the CSV that actually exists in /data
-    csv_path = os.path.join(
-        os.path.dirname(__file__), "data", "SW_Events.csv"
-    )
+def normalize_header(header):
+    """
+    Map one file's header row to canonical column names. Blank columns
+    (trailing commas in exported sheets) map to None and are dropped.
+    """
+    names = []
+    for h in header:
+        h = " ".join((h or "").split())
+        names.append(HEADER_ALIASES.get(h.lower(), h) or None)
+    return names
+
 
-    if not os.path.exists(csv_path):
-        print(f"⚠ {csv_path} not found — returning 0 rows")
-        return []
+def iter_csv_rows(source=None):
+    """
+    Lazily yield normalized row dicts from every CSV in `source`, one file
+    and one row at a time, so memory stays flat however big the input is.
+    """
+    paths = csv_files(source)
+    if not paths:
+        print(f"⚠ No CSV files found in {source or DATA_DIR} — returning 0 rows")
+        return
+
+    for path in paths:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                continue
+            names = normalize_header(header)
+            width = len(names)
 
-    rows = []
-    with open(csv_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
+            count = 0
+            for cells in reader:
+                if len(cells) < width:
+                    cells += [""] * (width - len(cells))
+                yield {name: cell for name, cell in zip(names, cells) if name}
+                count += 1
 
-    print(f"Loaded {len(rows)} rows from {os.path.basename(csv_path)}")
-    return rows
+        print(f"Loaded {count} rows from {os.path.basename(path)}")
+
+
+def load_from_csv(source=None):
+    """Load rows from the CSV files in data/ for local testing."""
+    return list(iter_csv_rows(source))
+
+
+class EventRecord(NamedTuple):
+    """One sheet row, parsed and validated, ready to be written."""
+    title: str
+    date: date
+    start_time: time
+    end_time: time
+    attendance: Optional[int]
+    location: Optional[str]
+    description: Optional[str]
+    type_name: Optional[str]
+    adverts: tuple
+    organizers: tuple
+    partners: tuple
+
+
+class NameCache:
+    """
+    In-memory name -> id map for a lookup table (Event_Type, Organizer, ...).
+    The table is read once; unknown names are inserted and flushed, and
+    forgotten again if the surrounding transaction is rolled back.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.ids = None
+        self.pending = []
+
+    def get_id(self, name):
+        if self.ids is None:
+            self.ids = {}
+            for instance_id, instance_name in (
+                db.session.query(self.model.id, self.model.name).order_by(self.model.id)
+            ):
+                self.ids.setdefault(instance_name, instance_id)
+
+        if name not in self.ids:
+            instance = self.model(name=name)
+            db.session.add(instance)
+            db.session.flush()  # get ID without committing
+            self.ids[name] = instance.id
+            self.pending.append(name)
+        return self.ids[name]
+
+    def commit(self):
+        self.pending = []
+
+    def rollback(self):
+        for name in self.pending:
+            self.ids.pop(name, None)
+        self.pending = []
 
 
 def return_id(model, name):
@@ -86,6 +263,18 @@ def clean_cell(cell):
         return None
     return cell.strip()
 
+# Fast paths for the cell formats the sheets actually use; anything they
+# don't match falls through to the general strptime-based parsers.
+_TIME_RE = re.compile(r"(\d{1,2})(?:[:.](\d{1,2}))?([ap]m)")
+_SHORT_DATE_RE = re.compile(r"(\d{1,2})-([a-z]{3})-(\d{2})", re.IGNORECASE)
+_LONG_DATE_RE = re.compile(r"([a-z]+)\s+(\d{1,2}),\s+(\d{4})", re.IGNORECASE)
+_RANGE_MONTH_DAY_RE = re.compile(r"([A-Za-z]+)\s+(\d+)")
+_RANGE_YEAR_RE = re.compile(r"(\d{4})")
+_MONTH_ABBRS = {m.lower(): i for i, m in enumerate(calendar.month_abbr) if m}
+_MONTH_NAMES = {m.lower(): i for i, m in enumerate(calendar.month_name) if m}
+
+
+@lru_cache(maxsize=4096)
 def parse_time(tstr):
     """
     Parse a time string like '3pm', '8.30pm', or '3:30pm' into a datetime.time object.
@@ -93,6 +282,16 @@ def parse_time(tstr):
     """
     if not tstr:
         return None
+    m = _TIME_RE.fullmatch(tstr.strip().lower())
+    if m:
+        hour = int(m.group(1))
+        minute = int(m.group(2) or 0)
+        if 1 <= hour <= 12 and minute < 60:
+            return time(hour % 12 + (12 if m.group(3) == "pm" else 0), minute)
+    return _parse_time_slow(tstr)
+
+
+def _parse_time_slow(tstr):
     tstr = tstr.strip().lower().replace('.', ':')  # convert 3.30pm -> 3:30pm
     # Add :00 if missing minutes
     if ':' not in tstr[:-2]:
@@ -102,6 +301,8 @@ def parse_time(tstr):
     except ValueError:
         return None
 
+
+@lru_cache(maxsize=4096)
 def parse_flexible_date(value):
     """
     Accept formats like:
@@ -115,21 +316,41 @@ def parse_flexible_date(value):
 
     v = value.strip()
 
+    m = _SHORT_DATE_RE.fullmatch(v)
+    if m and m.group(2).lower() in _MONTH_ABBRS:
+        year = int(m.group(3))
+        year += 2000 if year <= 68 else 1900  # same pivot as strptime's %y
+        try:
+            return date(year, _MONTH_ABBRS[m.group(2).lower()], int(m.group(1)))
+        except ValueError:
+            pass
+
+    m = _LONG_DATE_RE.fullmatch(v)
+    if m and m.group(1).lower() in _MONTH_NAMES:
+        try:
+            return date(int(m.group(3)), _MONTH_NAMES[m.group(1).lower()], int(m.group(2)))
+        except ValueError:
+            pass
+
+    return _parse_date_slow(v)
+
+
+def _parse_date_slow(v):
     # Case 1: standard dd-Mon-yy
     try:
         return datetime.strptime(v, "%d-%b-%y").date()
-    except:
+    except ValueError:
         pass
 
     # Case 2: long format (November 6, 2024)
     try:
         return datetime.strptime(v, "%B %d, %Y").date()
-    except:
+    except ValueError:
         pass
 
     # Case 3: extract first date from ranges (e.g., "November 6-7, 2024")
-    m = re.search(r"([A-Za-z]+)\s+(\d+)", v)
-    y = re.search(r"(\d{4})", v)
+    m = _RANGE_MONTH_DAY_RE.search(v)
+    y = _RANGE_YEAR_RE.search(v)
 
     if m and y:
         month = m.group(1)
@@ -137,80 +358,397 @@ def parse_flexible_date(value):
         year = y.group(1)
         try:
             return datetime.strptime(f"{month} {day} {year}", "%B %d %Y").date()
-        except:
+        except ValueError:
             pass
 
     return None
 
 
-def load_events():
-    rows = get_sheet_rows()
-    
-    for row in rows:
-        # Parse date safely
-        try:
-            date = parse_flexible_date(row['Date'])
-            date_cell = clean_cell(row.get("Date"))
-            if not date and date_cell and date_cell.lower() == "recurring":
-                date = None
-            elif not date:
-                print(f"Skipping row due to invalid date: {row.get('Date')}")
-                continue
-        except ValueError:
-            print(f"Skipping row due to invalid date: {row.get('Date')}")
+def split_cell(value):
+    """Split a comma/semicolon-separated cell into its cleaned, non-empty parts."""
+    return tuple(c for c in (clean_cell(v) for v in LIST_SEPARATOR.split(value or "")) if c)
+
+
+def parse_row(row):
+    """
+    Turn one raw sheet/CSV row into an EventRecord.
+    Raises ValueError with a printable reason if the row must be skipped.
+    """
+    date_cell = clean_cell(row.get("Date"))
+    event_date = parse_flexible_date(date_cell)
+    if not event_date:
+        if date_cell and date_cell.lower() == "recurring":
+            raise ValueError(f"Skipping recurring event without a date: {row.get('Name of Event/Activity')}")
+        raise ValueError(f"Skipping row due to invalid date: {row.get('Date')}")
+
+    start_time = parse_time(clean_cell(row.get('Start Time')))
+    end_time = parse_time(clean_cell(row.get('End Time')))
+    if not start_time or not end_time:
+        raise ValueError(f"Skipping row due to invalid time: {row.get('Start Time')} or {row.get('End Time')}")
+
+    attendance = clean_cell(row.get('Attendance'))
+    try:
+        attendance = int(attendance) if attendance else None
+    except ValueError:
+        raise ValueError(f"Skipping row due to invalid attendance: {row.get('Attendance')}") from None
+
+    return EventRecord(
+        title=clean_cell(row.get('Name of Event/Activity')) or "Untitled Event",
+        date=event_date,
+        start_time=start_time,
+        end_time=end_time,
+        attendance=attendance,
+        location=clean_cell(row.get('Location')),
+        description=clean_cell(row.get('Description')),
+        type_name=clean_cell(row.get('EventType')),
+        adverts=split_cell(row.get('Advertisement')),
+        organizers=split_cell(row.get('Lead Organizer')),
+        partners=split_cell(row.get('Partners')),
+    )
+
+
+def _parse_item(item):
+    """Process-pool worker: (row number, row) -> (row number, record, error)."""
+    number, row = item
+    try:
+        return number, parse_row(row), None
+    except ValueError as e:
+        return number, None, str(e)
+
+
+def parse_rows(rows, workers=None, chunksize=PARSE_CHUNKSIZE):
+    """
+    Parse and validate rows, yielding (row number, record, error) in order.
+    With workers > 1 the CPU-bound parsing runs in a process pool. Rows are
+    fed to the pool one window at a time so memory stays bounded.
+    """
+    numbered = enumerate(rows, start=1)
+    if not workers or workers <= 1:
+        yield from map(_parse_item, numbered)
+        return
+
+    window = chunksize * workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            items = list(islice(numbered, window))
+            if not items:
+                break
+            yield from pool.map(_parse_item, items, chunksize=chunksize)
+
+
+def validate_rows(rows=None, workers=None):
+    """
+    Dry run: parse every row without touching the DB and print a report of
+    the rows that would be skipped. Returns {"valid": n, "skipped": [...]}.
+    """
+    if rows is None:
+        rows = iter_sheet_rows()
+
+    valid = 0
+    skipped = []
+    for number, record, error in parse_rows(rows, workers):
+        if record:
+            valid += 1
+        else:
+            skipped.append((number, error))
+
+    print(f"Validation: {valid} valid rows, {len(skipped)} would be skipped")
+    for number, error in skipped:
+        print(f"  row {number}: {error}")
+    return {"valid": valid, "skipped": skipped}
+
+
+def _name_caches():
+    return {
+        "type": NameCache(Event_Type),
+        "advert": NameCache(Advertisement),
+        "organizer": NameCache(Organizer),
+        "partner": NameCache(Partners),
+    }
+
+
+def record_key(record, seen):
+    """
+    Stable natural key for a record: title, date and start time, plus an
+    occurrence number so exact repeats within one source stay distinct.
+    `seen` counts occurrences across a single load/sync pass.
+
+    The sheet has no ID column, so editing any of these fields (e.g. fixing
+    a typo in a title) makes sync see a new row plus a vanished one: the
+    event is re-inserted, and with prune=True the old event is deleted
+    together with its ProcessedFile/poster.
+    """
+    base = f"{record.title.lower()}|{record.date.isoformat()}|{record.start_time.isoformat()}"
+    seen[base] = seen.get(base, 0) + 1
+    return hashlib.sha1(f"{base}#{seen[base]}".encode("utf-8")).hexdigest()
+
+
+def record_hash(record):
+    """Hash of every parsed field, used to spot rows that changed."""
+    return hashlib.sha1(repr(tuple(record)).encode("utf-8")).hexdigest()
+
+
+def _event_values(record, caches):
+    """Column values for one record, plus its organizer and partner ids."""
+    advert_ids = [caches["advert"].get_id(a) for a in record.adverts]
+    # dict.fromkeys keeps order while dropping repeated names in one cell
+    org_ids = list(dict.fromkeys(caches["organizer"].get_id(o) for o in record.organizers))
+    part_ids = list(dict.fromkeys(caches["partner"].get_id(p) for p in record.partners))
+
+    values = {
+        "title": record.title,
+        "date": record.date,
+        "year": record.date.year,
+        "month": record.date.month,
+        "start_time": record.start_time,
+        "end_time": record.end_time,
+        "attendance": record.attendance,
+        "location": record.location,
+        "description": record.description,
+        "type_id": caches["type"].get_id(record.type_name) if record.type_name else None,
+        "advert_id": advert_ids[0] if advert_ids else None,  # main FK
+        "lead_organizer": org_ids[0] if org_ids else None,  # main FK
+        "partner_id": part_ids[0] if part_ids else None,  # main FK
+    }
+    return values, org_ids, part_ids
+
+
+def _insert_links(event_ids, organizer_ids, partner_ids):
+    organizer_links = [
+        {"event_id": eid, "organizer_id": oid}
+        for eid, oids in zip(event_ids, organizer_ids) for oid in oids
+    ]
+    partner_links = [
+        {"event_id": eid, "partner_id": pid}
+        for eid, pids in zip(event_ids, partner_ids) for pid in pids
+    ]
+    insert_ignore(event_organizers, organizer_links)
+    insert_ignore(event_partners, partner_links)
+
+
+def _insert_imported(event_ids, items):
+    db.session.execute(insert(ImportedRow), [
+        {"source_key": key, "content_hash": record_hash(record), "event_id": eid}
+        for eid, (key, record) in zip(event_ids, items)
+    ])
+
+
+def _insert_records(items, caches):
+    """Insert a chunk of (key, record) items with one statement per table."""
+    rows = [_event_values(record, caches) for _, record in items]
+
+    event_ids = db.session.scalars(
+        insert(Events).returning(Events.id, sort_by_parameter_order=True),
+        [values for values, _, _ in rows],
+    ).all()
+
+    _insert_links(event_ids, [o for _, o, _ in rows], [p for _, _, p in rows])
+    _insert_imported(event_ids, items)
+    apply_changes(added=[event_snapshot(values) for values, _, _ in rows])
+
+
+def _update_records(items, caches):
+    """Rewrite a chunk of (event_id, key, record) items whose source row changed."""
+    event_ids = [eid for eid, _, _ in items]
+    rows = [_event_values(record, caches) for _, _, record in items]
+    apply_changes(
+        removed=snapshots_for(event_ids),
+        added=[event_snapshot(values) for values, _, _ in rows],
+    )
+
+    db.session.execute(update(Events), [
+        dict(values, id=eid) for eid, (values, _, _) in zip(event_ids, rows)
+    ])
+
+    db.session.execute(delete(event_organizers).where(event_organizers.c.event_id.in_(event_ids)))
+    db.session.execute(delete(event_partners).where(event_partners.c.event_id.in_(event_ids)))
+    _insert_links(event_ids, [o for _, o, _ in rows], [p for _, _, p in rows])
+
+    keys = [key for _, key, _ in items]
+    db.session.execute(delete(ImportedRow).where(ImportedRow.source_key.in_(keys)))
+    _insert_imported(event_ids, [(key, record) for _, key, record in items])
+
+
+def _write_batch(items, caches, writer=_insert_records):
+    """
+    Write a chunk of items with `writer` and commit once. If the chunk fails,
+    retry it row by row so each bad row is reported on its own.
+    Returns the number of events written.
+    """
+    try:
+        writer(items, caches)
+        bump_data_version()
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for cache in caches.values():
+            cache.rollback()
+        if len(items) == 1:
+            print(f"Skipping row due to DB error ({items[0][-1].title}): {e}")
+            return 0
+        return sum(_write_batch([item], caches, writer) for item in items)
+
+    for cache in caches.values():
+        cache.commit()
+    return len(items)
+
+
+def load_events(rows=None, batch_size=BATCH_SIZE, progress=None, workers=None):
+    """
+    Load events from Google Sheets / CSV (or the given rows) in batches.
+    Rows already imported are skipped (sync_events applies their changes).
+    `progress`, if given, is called with the running total after each batch.
+    `workers` > 1 parses rows in a process pool while this process writes.
+    Returns the number of events written.
+    """
+    if rows is None:
+        rows = iter_sheet_rows()
+
+    imported = {key for (key,) in db.session.query(ImportedRow.source_key)}
+    caches = _name_caches()
+    seen = {}
+    batch = []
+    loaded = 0
+    already = 0
+
+    for _, record, error in parse_rows(rows, workers):
+        if error:
+            print(error)
             continue
-        
-        start_time = parse_time(clean_cell(row.get('Start Time')))
-        end_time = parse_time(clean_cell(row.get('End Time')))
-        if not start_time or not end_time:
-            print(f"Skipping row due to invalid time: {row.get('Start Time')} or {row.get('End Time')}")
+
+        key = record_key(record, seen)
+        if key in imported:
+            already += 1
             continue
+        batch.append((key, record))
+        if len(batch) >= batch_size:
+            loaded += _write_batch(batch, caches)
+            batch = []
+            if progress:
+                progress(loaded)
+
+    if batch:
+        loaded += _write_batch(batch, caches)
+        if progress:
+            progress(loaded)
 
-        # Event type
-        type_name = clean_cell(row.get('EventType'))
-        type_id = return_id(Event_Type, type_name) if type_name else None
-        
-        # Create Event
-        event = Events(
-            title=clean_cell(row.get('Name of Event/Activity')) or "Untitled Event",
-            date=date,
-            start_time=start_time,
-            end_time=end_time,
-            attendance=int(row['Attendance']) if row.get('Attendance') else None,
-            location=clean_cell(row.get('Location')),
-            description=clean_cell(row.get('Description')),
-            type_id=type_id
+    if already:
+        print(f"{already} rows were already imported - use sync-events to apply changes to them")
+    print(f"Data loaded successfully: {loaded} events")
+    return loaded
+
+
+def _unimported_events():
+    """
+    Natural keys of events that predate sync (no ImportedRow yet), so a first
+    sync adopts them instead of inserting duplicates.
+    """
+    seen = {}
+    keys = {}
+    q = (
+        db.session.query(Events.id, Events.title, Events.date, Events.start_time)
+        .outerjoin(ImportedRow, ImportedRow.event_id == Events.id)
+        .filter(ImportedRow.id.is_(None), Events.start_time.isnot(None))
+        .order_by(Events.id)
+    )
+    for e in q:
+        keys[record_key(e, seen)] = e.id
+    return keys
+
+
+def delete_events(event_ids):
+    """Delete events together with their link, import and file rows."""
+    for i in range(0, len(event_ids), BATCH_SIZE):
+        chunk = event_ids[i:i + BATCH_SIZE]
+        apply_changes(removed=snapshots_for(chunk))
+        db.session.execute(delete(event_organizers).where(event_organizers.c.event_id.in_(chunk)))
+        db.session.execute(delete(event_partners).where(event_partners.c.event_id.in_(chunk)))
+        db.session.execute(delete(ImportedRow).where(ImportedRow.event_id.in_(chunk)))
+        db.session.execute(delete(ProcessedFile).where(ProcessedFile.event_id.in_(chunk)))
+        db.session.execute(delete(Events).where(Events.id.in_(chunk)))
+    bump_data_version()
+    db.session.commit()
+
+
+def sync_events(rows=None, batch_size=BATCH_SIZE, prune=False, progress=None, workers=None):
+    """
+    Bring the DB in line with the sheet/CSV without reloading everything.
+    Unchanged rows are skipped, changed rows are updated in place, new rows
+    are inserted, and rows that vanished from the source are reported
+    (and deleted when prune=True). Nothing is pruned if any row failed to
+    parse, since a skipped row has no key and its event would look vanished;
+    see record_key() for what counts as the same row. `progress` is called
+    with the number of events written so far after each batch.
+    Returns a dict of counts plus the list of vanished event ids.
+    """
+    if rows is None:
+        rows = iter_sheet_rows()
+
+    known = {
+        key: (digest, event_id)
+        for key, digest, event_id in db.session.query(
+            ImportedRow.source_key, ImportedRow.content_hash, ImportedRow.event_id
         )
-        db.session.add(event)
-        db.session.flush()  # get event.id without committing yet
-        
-        # Handle multiple advertisements
-        advert_cells = [clean_cell(a) for a in (row.get('Advertisement','').split(',')) if clean_cell(a)]
-        advert_ids = [return_id(Advertisement, a) for a in advert_cells]
-        if advert_ids:
-            event.advert_id = advert_ids[0]  # main FK
-        
-        # Handle multiple organizers
-        organizer_cells = [clean_cell(o) for o in (row.get('Lead Organizer','').split(',')) if clean_cell(o)]
-        organizer_ids = [return_id(Organizer, o) for o in organizer_cells]
-        for oid in organizer_ids:
-            db.session.execute(event_organizers.insert().values(event_id=event.id, organizer_id=oid).prefix_with("OR IGNORE"))
-        if organizer_ids:
-            event.lead_organizer = organizer_ids[0]  # main FK
-        
-        # Handle multiple partners
-        partner_cells = [clean_cell(p) for p in (row.get('Partners','').split(',')) if clean_cell(p)]
-        partner_ids = [return_id(Partners, p) for p in partner_cells]
-        for pid in partner_ids:
-            db.session.execute(event_partners.insert().values(event_id=event.id, partner_id=pid).prefix_with("OR IGNORE"))
-        if partner_ids:
-            event.partner_id = partner_ids[0]  # main FK
-        
-        # Commit once per row
-        try:
-            db.session.commit()
-        except Exception as e:
-            db.session.rollback()
-            print(f"Skipping row due to DB error: {e}")
+    }
+    adoptable = _unimported_events()
+
+    caches = _name_caches()
+    seen = {}
+    visited = set()
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    new_batch = []
+    changed_batch = []
+
+    for _, record, error in parse_rows(rows, workers):
+        if error:
+            print(error)
+            stats["skipped"] += 1
+            continue
+
+        key = record_key(record, seen)
+        visited.add(key)
 
-    print("Data loaded successfully from CSV!")
\ No newline at end of file
+        if key in known:
+            digest, event_id = known[key]
+            if digest == record_hash(record):
+                stats["unchanged"] += 1
+                continue
+            changed_batch.append((event_id, key, record))
+        elif key in adoptable:
+            changed_batch.append((adoptable.pop(key), key, record))
+        else:
+            new_batch.append((key, record))
+
+        if len(new_batch) >= batch_size:
+            stats["added"] += _write_batch(new_batch, caches)
+            new_batch = []
+        elif len(changed_batch) >= batch_size:
+            stats["updated"] += _write_batch(changed_batch, caches, _update_records)
+            changed_batch = []
+        else:
+            continue
+        if progress:
+            progress(stats["added"] + stats["updated"])
+
+    if new_batch:
+        stats["added"] += _write_batch(new_batch, caches)
+    if changed_batch:
+        stats["updated"] += _write_batch(changed_batch, caches, _update_records)
+    if progress:
+        progress(stats["added"] + stats["updated"])
+
+    vanished = [event_id for key, (_, event_id) in known.items() if key not in visited]
+    if vanished:
+        print(f"{len(vanished)} events no longer in the source: {vanished[:20]}")
+        if prune and stats["skipped"]:
+            print(f"Not pruning: {stats['skipped']} rows could not be parsed and may still be in the source")
+        elif prune:
+            delete_events(vanished)
+            print(f"Deleted {len(vanished)} vanished events")
+
+    stats["vanished"] = vanished
+    print(
+        f"Sync finished: {stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['skipped']} skipped, {len(vanished)} vanished"
+    )
+    return stats
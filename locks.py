@@ -0,0 +1,61 @@
+# File locks in the instance folder, shared by the worker processes of one
+# deployment (imports, schema upgrades).
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process lock
+    fcntl = None
+
+# One thread lock per lock file, so threads of a worker also exclude each other
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _local_lock(name):
+    with _local_locks_guard:
+        return _local_locks.setdefault(name, threading.Lock())
+
+
+class InstanceLock:
+    """
+    Lock on <instance>/<name> so only one worker process
+    (and one thread within it) holds it at a time.
+    """
+
+    def __init__(self, instance_path, name):
+        self.path = os.path.join(instance_path, name)
+        self.local = _local_lock(name)
+        self.fp = None
+
+    def acquire(self, wait=False):
+        if not self.local.acquire(blocking=wait):
+            return False
+        if fcntl is None:
+            return True
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.fp = open(self.path, "w", encoding="utf-8")
+        try:
+            fcntl.flock(self.fp, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self.fp.close()
+            self.fp = None
+            self.local.release()
+            return False
+        return True
+
+    def release(self):
+        if self.fp:
+            fcntl.flock(self.fp, fcntl.LOCK_UN)
+            self.fp.close()
+            self.fp = None
+        self.local.release()
+
+    def __enter__(self):
+        self.acquire(wait=True)
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
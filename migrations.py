@@ -0,0 +1,96 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import inspect, text, update, extract, select
+from db_helpers import insert_ignore_stmt
+from locks import InstanceLock
+from models import db, Events, MonthlyRollup, DataVersion
+from rollups import rebuild_statements
+from cache import DATA_VERSION_ID
+
+
+def add_missing_columns(conn):
+    """
+    ALTER TABLE ... ADD COLUMN for model columns an existing table lacks
+    (create_all() only creates missing tables). New columns must be nullable.
+    """
+    inspector = inspect(conn)
+    quote = conn.dialect.identifier_preparer
+    added = []
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(
+                f"ALTER TABLE {quote.format_table(table)} ADD COLUMN {quote.format_column(column)} {col_type}"
+            ))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def create_missing_indexes(conn):
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def backfill_event_date_parts(conn):
+    conn.execute(
+        update(Events.__table__)
+        .where(Events.year.is_(None))
+        .values(year=extract("year", Events.date), month=extract("month", Events.date))
+    )
+
+
+def backfill_event_updated_at(conn):
+    conn.execute(
+        update(Events.__table__)
+        .where(Events.updated_at.is_(None))
+        .values(updated_at=datetime.utcnow())
+    )
+
+
+def backfill_rollups(conn):
+    """Build the monthly rollup for databases that predate it."""
+    has_rollups = conn.execute(select(MonthlyRollup.year).limit(1)).first()
+    has_events = conn.execute(select(Events.id).limit(1)).first()
+    if has_events and not has_rollups:
+        for stmt in rebuild_statements():
+            conn.execute(stmt)
+
+
+def seed_data_version(conn):
+    # Insert-or-ignore: a worker booting without the schema lock must not fail on the key
+    conn.execute(insert_ignore_stmt(
+        DataVersion.__table__,
+        [{"id": DATA_VERSION_ID, "version": 0, "updated_at": datetime.utcnow()}],
+        conn.dialect.name,
+    ))
+
+
+# Postgres advisory lock key for upgrades run from more than one host
+SCHEMA_LOCK_KEY = 7_301_011
+
+# Data fix-ups run after columns exist, in order; each must be idempotent
+BACKFILLS = [backfill_event_date_parts, backfill_event_updated_at, backfill_rollups, seed_data_version]
+
+
+def upgrade_schema():
+    """
+    Bring an existing database up to date with models.py: add new columns
+    and indexes, then run the backfills. Safe to run on every start: workers
+    take turns under <instance>/schema.lock (and a Postgres advisory lock),
+    so the ALTERs and the rollup backfill run once.
+    """
+    with InstanceLock(current_app.instance_path, "schema.lock"), db.engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": SCHEMA_LOCK_KEY})
+        added = add_missing_columns(conn)
+        create_missing_indexes(conn)
+        for backfill in BACKFILLS:
+            backfill(conn)
+    if added:
+        print(f"Schema upgraded: added {', '.join(added)}")
@@ -1,4 +1,5 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import validates
 from flask_login import UserMixin
 from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash  # <-- add this
@@ -41,6 +42,22 @@ class Events(db.Model):
     lead_organizer = db.Column(db.Integer, db.ForeignKey('organizers.id'), nullable=True)
     type_id = db.Column(db.Integer, db.ForeignKey('event_type.id'), nullable=True)
 
+    # Copies of date.year / date.month (kept in sync by set_date_parts) so
+    # year filters and month GROUP BYs can use an index instead of extract()
+    year = db.Column(db.Integer, nullable=True)
+    month = db.Column(db.Integer, nullable=True)
+    # Drives the ETag / Last-Modified of /api/v1/events/<id>
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_events_year_month', 'year', 'month'),
+        db.Index('ix_events_date_id', 'date', 'id'),
+        db.Index('ix_events_type_date', 'type_id', 'date'),
+        db.Index('ix_events_lead_organizer_date', 'lead_organizer', 'date'),
+        db.Index('ix_events_advert_id', 'advert_id'),
+        db.Index('ix_events_partner_id', 'partner_id'),
+    )
+
     # partners = db.relationship('Partners', secondary='event_partners', backref=db.backref('events', lazy='dynamic'),lazy='dynamic')
     partners = db.relationship(
     'Partners',
@@ -52,6 +69,12 @@ class Events(db.Model):
 
     organizer_obj = db.relationship('Organizer', foreign_keys=[lead_organizer])
 
+    @validates('date')
+    def set_date_parts(self, key, value):
+        self.year = value.year if value else None
+        self.month = value.month if value else None
+        return value
+
 class Advertisement(db.Model):
     __tablename__ = "advertisement"
     id = db.Column(db.Integer, primary_key=True)
@@ -83,20 +106,137 @@ class Event_Type(db.Model):
 class ProcessedFile(db.Model):
     __tablename__ = 'processed_files'
     id = db.Column(db.Integer, primary_key=True)
+    # "<event id>/<uploaded name>": one poster row per event, so two events
+    # may upload files with the same name
     filename = db.Column(db.String(400), unique=True, nullable=False)
     processed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # sha256 of the file; identical posters reuse poster_url instead of re-uploading
+    content_hash = db.Column(db.String(64), nullable=True, index=True)
+    poster_url = db.Column(db.String(500), nullable=True)
     
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False, index=True)
     event = db.relationship('Events', backref='processed_files', lazy=True)
 
+class ImportedRow(db.Model):
+    """Links a sheet/CSV row (by natural key) to the event it produced."""
+    __tablename__ = 'imported_rows'
+    id = db.Column(db.Integer, primary_key=True)
+    source_key = db.Column(db.String(40), unique=True, nullable=False)
+    content_hash = db.Column(db.String(40), nullable=False)
+    synced_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False, index=True)
+    event = db.relationship('Events', backref='imported_rows', lazy=True)
+
+class MonthlyRollup(db.Model):
+    """
+    Event count and attendance per (year, month, event type), kept up to
+    date by every write path so dashboards never scan the events table.
+    type_id 0 stands for events without a type.
+    """
+    __tablename__ = 'monthly_rollups'
+    year = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    month = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    type_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+    attendance_sum = db.Column(db.Integer, nullable=False, default=0)
+
+class IngestRun(db.Model):
+    """One sheet/CSV import job, shared by all workers for status reporting."""
+    __tablename__ = 'ingest_runs'
+    id = db.Column(db.Integer, primary_key=True)
+    mode = db.Column(db.String(20), nullable=False, default="load")
+    status = db.Column(db.String(20), nullable=False, default="running")
+    rows_loaded = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "status": self.status,
+            "rows_loaded": self.rows_loaded,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+class ReportJob(db.Model):
+    """A queued/running/finished report render, visible to every worker for polling."""
+    __tablename__ = 'report_jobs'
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    # Content-addressed report file name (report_gen.report_filename); identical requests share it
+    filename = db.Column(db.String(100), nullable=False, index=True)
+    # The filename while the job is queued/running, NULL once finished: the
+    # unique index allows one active job per report across all workers
+    active_key = db.Column(db.String(100), nullable=True, unique=True, index=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set when queued and when a worker starts it; too old means the worker died
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "year": self.year,
+            "status": self.status,
+            "url": f"/api/reports/files/{self.filename}" if self.status == "done" else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "heartbeat_at": self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+class ReportFile(db.Model):
+    """Index of the rendered reports in <instance>/reports, used for listing and retention."""
+    __tablename__ = 'report_files'
+    id = db.Column(db.Integer, primary_key=True)
+    filename = db.Column(db.String(100), unique=True, nullable=False)
+    year = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    size_bytes = db.Column(db.Integer, nullable=False, default=0)
+    data_version = db.Column(db.Integer, nullable=True)
+    hits = db.Column(db.Integer, nullable=False, default=0)
+    last_hit_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "url": f"/api/reports/files/{self.filename}",
+            "year": self.year,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "size_bytes": self.size_bytes,
+            "data_version": self.data_version,
+            "hits": self.hits,
+            "last_hit_at": self.last_hit_at.isoformat() if self.last_hit_at else None,
+        }
+
+class DataVersion(db.Model):
+    """
+    Single row (id=1) bumped in the same transaction as every change to
+    events, so each worker can tell whether its cached responses are stale.
+    """
+    __tablename__ = 'data_version'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
 event_organizers = db.Table(
     'event_organizers',
     db.Column('event_id', db.Integer, db.ForeignKey('events.id'), primary_key=True),
     db.Column('organizer_id', db.Integer, db.ForeignKey('organizers.id'), primary_key=True),
+    db.Index('ix_event_organizers_organizer_id', 'organizer_id'),
 )
 
 event_partners = db.Table(
     'event_partners',
     db.Column('event_id', db.Integer, db.ForeignKey('events.id'), primary_key=True),
     db.Column('partner_id', db.Integer, db.ForeignKey('partners.id'), primary_key=True),
+    db.Index('ix_event_partners_partner_id', 'partner_id'),
 )
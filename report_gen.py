@@ -1,9 +1,19 @@
-from flask import Blueprint, request, jsonify, render_template, current_app, send_from_directory
-from models import db, Events, Event_Type
-from sqlalchemy import extract
-from datetime import datetime
-from collections import Counter
+from flask import Blueprint, request, jsonify, stream_template, current_app, send_from_directory, url_for
+from sqlalchemy import and_, func, or_, update
+from models import db, Events, Event_Type, MonthlyRollup, ReportFile, ReportJob
+from db_helpers import insert_ignore, MAX_PARAMS
+from rollups import monthly_totals
+from cache import cached, data_version
+from calendar import month_name
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import hashlib
 import os
+import re
+import threading
+import time
+import traceback
+import uuid
 
 reports_bp = Blueprint("reports", __name__)
 
@@ -11,9 +21,11 @@ reports_bp = Blueprint("reports", __name__)
 # Return available years
 # -------------------------
 @reports_bp.get("/events/years")
+@cached
 def api_get_years():
     years = (
-        db.session.query(extract("year", Events.date).label("year"))
+        db.session.query(Events.year.label("year"))
+        .filter(Events.year.isnot(None))
         .group_by("year")
         .order_by("year")
         .all()
@@ -29,36 +41,52 @@ def api_get_years_plain():
 # -------------------------
 # Read events by year
 # -------------------------
-def read_events(year=None):
-    q = db.session.query(Events, Event_Type.name.label("type")) \
-        .join(Event_Type, Events.type_id == Event_Type.id, isouter=True)
-
+def read_events(year=None, batch_size=1000):
+    """
+    Detail rows for the report table as plain column tuples (no ORM objects),
+    read in keyset pages of `batch_size` on (date, id). Memory stays bounded
+    and no cursor is left open while the report is written, so other
+    connections (job heartbeats, request writes) can commit meanwhile, even
+    on SQLite.
+    """
+    q = (
+        db.session.query(
+            Events.id,
+            Events.title,
+            Events.date,
+            Events.start_time.label("start"),
+            Events.end_time.label("end"),
+            Events.attendance,
+            Events.location,
+            func.coalesce(Event_Type.name, "Unknown").label("type"),
+        )
+        .outerjoin(Event_Type, Events.type_id == Event_Type.id)
+        .order_by(Events.date, Events.id)
+    )
     if year:
-        q = q.filter(extract("year", Events.date) == year)
-
-    rows = []
-    for e, type_name in q.all():
-        rows.append({
-            "title": e.title,
-            "date": e.date,
-            "start": e.start_time,
-            "end": e.end_time,
-            "attendance": e.attendance,
-            "location": e.location,
-            "type": type_name or "Unknown"
-        })
-    return rows
+        q = q.filter(Events.year == year)
+
+    page = q.limit(batch_size).all()
+    while page:
+        yield from page
+        if len(page) < batch_size:
+            return
+        last = page[-1]
+        page = q.filter(or_(
+            Events.date > last.date,
+            and_(Events.date == last.date, Events.id > last.id),
+        )).limit(batch_size).all()
 
 # -------------------------
 # Summaries for charts
 # -------------------------
-def summarize(rows):
+def summarize(year=None):
+    """Monthly/total event and attendance counts, read from the rollup table."""
     by_month = {m: {"events": 0, "attendance": 0} for m in range(1, 13)}
 
-    for r in rows:
-        m = r["date"].month
-        by_month[m]["events"] += 1
-        by_month[m]["attendance"] += (r["attendance"] or 0)
+    for r in monthly_totals(year):
+        by_month[r.month]["events"] = r.event_count
+        by_month[r.month]["attendance"] = r.total_attendance
 
     return {
         "total_events": sum(v["events"] for v in by_month.values()),
@@ -66,65 +94,466 @@ def summarize(rows):
         "by_month": by_month
     }
 
+
+def count_by_type(year=None):
+    """[(type name, event count)] from the rollup; events without a type count as "Unknown"."""
+    type_name = func.coalesce(Event_Type.name, "Unknown")
+    q = (
+        db.session.query(type_name, func.sum(MonthlyRollup.event_count))
+        .outerjoin(Event_Type, Event_Type.id == MonthlyRollup.type_id)
+        .group_by(type_name)
+        .order_by(type_name)
+    )
+    if year:
+        q = q.filter(MonthlyRollup.year == year)
+    return q.all()
+
 # -------------------------
 # Generate report
 # -------------------------
+REPORT_TEMPLATE = "standalone_report.html"
+
+
+def parse_year(value):
+    return int(value) if value and str(value).isdigit() else None
+
+
+def template_version():
+    """Hash of the report template source, so editing it invalidates saved reports."""
+    source, _, _ = current_app.jinja_env.loader.get_source(current_app.jinja_env, REPORT_TEMPLATE)
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()
+
+
+def report_filename(year, version=None):
+    """
+    Content-addressed name for a report: same (year, template version, data
+    version) -> same file, so an unchanged report is never rendered twice.
+    """
+    version = data_version() if version is None else version
+    key = f"{year}|{template_version()}|{version}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return f"report_{year if year else 'all'}_{digest}.html"
+
+
+def report_path(fname):
+    return os.path.join(current_app.instance_path, "reports", fname)
+
+
+def render_report(year):
+    """
+    Render the standalone HTML report for a year (None: all years) as a
+    stream of HTML chunks; table rows are pulled from the DB as the template
+    reaches them, so memory does not grow with the number of events.
+    """
+    summary = summarize(year)
+    fallback = bool(year) and summary["total_events"] == 0
+    if fallback:
+        summary = summarize(None)
+    report_year = None if fallback else year
+
+    title = f"Events Report {year}" if year and not fallback else "Events Report (All Years)"
+    note = (
+        f"<p style='color:#6b7280'>No rows found for {year}. Showing all years.</p>" if fallback else ""
+    )
+
+    months = list(month_name)[1:]
+    events_by_month = [summary['by_month'][m]['events'] for m in range(1, 13)]
+    types = count_by_type(report_year)
+
+    return stream_template(
+        REPORT_TEMPLATE,
+        title=title,
+        note=note,
+        summary=summary,
+        rows=read_events(report_year),
+        row_count=summary["total_events"],
+        year=year,
+        months=months,
+        attendance=events_by_month,
+        js_pie_labels=[name for name, _ in types],
+        js_pie_values=[count for _, count in types],
+    )
+
+
+def generate_report_file(year, heartbeat=None):
+    """
+    Write the report for `year` to instance/reports unless an up-to-date
+    copy already exists. `heartbeat`, if given, is called after every
+    chunk written. Returns (filename, reused).
+    """
+    version = data_version()
+    fname = report_filename(year, version)
+    path = report_path(fname)
+    if os.path.exists(path):
+        return fname, True
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            for chunk in render_report(year):
+                fp.write(chunk)
+                if heartbeat:
+                    heartbeat()
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+    register_report(fname, year, os.path.getsize(path), version)
+    enforce_retention(keep=(fname,))
+    return fname, False
+
+
 @reports_bp.route("/generate", methods=["GET", "POST"])
 def api_generate_report():
     data = (
         request.get_json(silent=True)
         if request.method == "POST"
         else request.args
-    )
-    year = data.get("year")
-    year = int(year) if year and str(year).isdigit() else None
+    ) or {}
+    fname, reused = generate_report_file(parse_year(data.get("year")))
 
-    rows = read_events(year)
-    fallback = False
+    return jsonify({
+        "url": f"/api/reports/files/{fname}",
+        "report_id": fname,
+        "cached": reused
+    })
 
-    if year and not rows:
-        fallback = True
-        rows = read_events(None)
+# -------------------------
+# Background report jobs
+# -------------------------
+class ReportJobQueue:
+    """
+    Bounded thread pool that renders reports outside the request. Job rows
+    live in the database so any worker can answer status polls. workers=0
+    renders inline (tests).
 
-    summary = summarize(rows)
-    
-    months = [summary['by_month'][m]['events'] for m in range(1, 13)]
-    attendance = [summary['by_month'][m]['attendance'] for m in range(1, 13)]
+    While a job renders, its worker refreshes heartbeat_at every timeout/4
+    seconds, for that job and for the jobs still waiting in its own pool.
+    A queued or running job whose heartbeat is older than `timeout` seconds
+    therefore belonged to a worker that died, and is queued again.
+    """
 
-    type_counter = Counter(r["type"] for r in rows)
-    js_pie_labels = list(type_counter.keys())
-    js_pie_values = list(type_counter.values())
+    ACTIVE = ("queued", "running")
 
-    html = render_template(
-        "standalone_report.html",
-        title=f"Events Report {year}" if year and not fallback else "Events Report (All Years)",
-        summary=summary,
-        rows=rows,
-        year=year,
-        months=months,
-        attendance=attendance,
-        js_pie_labels=js_pie_labels,
-        js_pie_values=js_pie_values,
+    def __init__(self, app, workers=2, timeout=600):
+        self.app = app
+        self.workers = workers
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.waiting = set()  # ids submitted to this process's pool, not yet started
+        self.beat_at = time.monotonic()
+        self.executor = None  # created on first use so it is never inherited across fork
+
+    def submit(self, year):
+        """
+        Return the job for this report, creating one only if no identical
+        job is active or already done with its file still on disk.
+        """
+        fname = report_filename(year)
+        now = datetime.utcnow()
+        if os.path.exists(report_path(fname)):
+            job = (
+                ReportJob.query.filter_by(filename=fname, status="done")
+                .order_by(ReportJob.id.desc())
+                .first()
+            )
+            if job is None:
+                job = ReportJob(year=year, filename=fname, status="done", finished_at=now)
+                db.session.add(job)
+                db.session.commit()
+            return job
+
+        # The unique active_key makes this insert the atomic claim: of two
+        # identical requests only one creates a job, the other joins it
+        created = insert_ignore(ReportJob.__table__, [{
+            "year": year,
+            "filename": fname,
+            "status": "queued",
+            "active_key": fname,
+            "created_at": now,
+            "heartbeat_at": now,
+        }])
+        db.session.commit()
+        job = ReportJob.query.filter_by(active_key=fname).first()
+        if job is None:
+            # The active job finished in between
+            return self.submit(year)
+        if created or self._requeue_if_stale(job.id):
+            self._start(job.id)
+            db.session.refresh(job)
+        return job
+
+    def _requeue_if_stale(self, job_id):
+        """Queue an orphaned job again; True for the one caller whose UPDATE won."""
+        now = datetime.utcnow()
+        requeued = db.session.execute(
+            update(ReportJob)
+            .where(
+                ReportJob.id == job_id,
+                ReportJob.status.in_(self.ACTIVE),
+                ReportJob.heartbeat_at < now - timedelta(seconds=self.timeout),
+            )
+            .values(status="queued", heartbeat_at=now)
+        ).rowcount
+        db.session.commit()
+        if requeued:
+            print(f"Report job {job_id} was orphaned - queued again")
+        return bool(requeued)
+
+    def _start(self, job_id):
+        if not self.workers:
+            self.run(job_id)
+            return
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report")
+            self.waiting.add(job_id)
+            self.executor.submit(self.run, job_id)
+
+    def heartbeat(self, job_id):
+        """
+        A callable that refreshes heartbeat_at. The clock is shared by the
+        whole queue, so a backlog of short jobs still beats every timeout/4
+        seconds for the jobs waiting behind them.
+        """
+        def beat():
+            with self.lock:
+                now = time.monotonic()
+                if now - self.beat_at < self.timeout / 4:
+                    return
+                self.beat_at = now
+                ids = [job_id, *self.waiting]
+            try:
+                # Own connection and transaction: the render's session is not committed mid-report
+                with db.engine.begin() as conn:
+                    conn.execute(
+                        update(ReportJob)
+                        .where(ReportJob.id.in_(ids), ReportJob.status.in_(self.ACTIVE))
+                        .values(heartbeat_at=datetime.utcnow())
+                    )
+            except Exception as e:
+                print(f"Report job {job_id}: heartbeat not recorded ({e})")
+
+        return beat
+
+    def run(self, job_id):
+        with self.lock:
+            self.waiting.discard(job_id)
+        with self.app.app_context():
+            claimed = db.session.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id, ReportJob.status == "queued")
+                .values(status="running", heartbeat_at=datetime.utcnow())
+            ).rowcount
+            db.session.commit()
+            if not claimed:
+                return
+
+            year = db.session.get(ReportJob, job_id).year
+            result = {"status": "done"}
+            try:
+                result["filename"], _ = generate_report_file(year, heartbeat=self.heartbeat(job_id))
+            except Exception as e:
+                db.session.rollback()
+                traceback.print_exc()
+                result = {"status": "failed", "error": str(e)}
+            db.session.execute(
+                update(ReportJob)
+                .where(ReportJob.id == job_id)
+                .values(active_key=None, finished_at=datetime.utcnow(), **result)
+            )
+            db.session.commit()
+
+
+def init_report_jobs(app):
+    app.extensions["report_jobs"] = ReportJobQueue(
+        app,
+        workers=app.config.get("REPORT_WORKERS", 2),
+        timeout=app.config.get("REPORT_JOB_TIMEOUT", 600),
     )
 
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    fname = f"report_{year if year else 'all'}_{ts}.html"
 
+@reports_bp.post("/jobs")
+def api_submit_report_job():
+    """Queue a report render; poll the returned status_url until status is done."""
+    data = request.get_json(silent=True) or {}
+    job = current_app.extensions["report_jobs"].submit(parse_year(data.get("year")))
+    body = job_body(job)
+    body["status_url"] = url_for("reports.api_report_job", job_id=job.id)
+    return jsonify(body), 200 if job.status == "done" else 202
+
+
+@reports_bp.get("/jobs/<int:job_id>")
+def api_report_job(job_id):
+    job = db.session.get(ReportJob, job_id)
+    if not job:
+        return jsonify({"error": "job not found"}), 404
+    return jsonify(job_body(job))
+
+
+def job_body(job):
+    """to_dict() plus the staleness timeout, so pollers know how long a silent heartbeat may last."""
+    body = job.to_dict()
+    body["timeout"] = current_app.extensions["report_jobs"].timeout
+    return body
+
+# -------------------------
+# Report index and retention
+# -------------------------
+def register_report(fname, year, size, version=None, created_at=None):
+    """Record a report file in the index (no-op if another worker already did)."""
+    insert_ignore(ReportFile.__table__, [{
+        "filename": fname,
+        "year": year,
+        "created_at": created_at or datetime.utcnow(),
+        "size_bytes": size,
+        "data_version": version,
+        "hits": 0,
+    }])
+    db.session.commit()
+
+
+def index_report_dir():
+    """
+    Reconcile the index with <instance>/reports: add rows for files it does
+    not know (e.g. reports written before the index existed) and drop rows
+    whose file is gone. A directory scan, so only run from the CLI.
+    """
     out_dir = os.path.join(current_app.instance_path, "reports")
-    os.makedirs(out_dir, exist_ok=True)
+    on_disk = {f for f in os.listdir(out_dir) if f.endswith(".html")} if os.path.isdir(out_dir) else set()
+    known = {f for f, in db.session.query(ReportFile.filename)}
+
+    for fname in sorted(on_disk - known):
+        match = re.match(r"report_(\d+)_", fname)
+        path = report_path(fname)
+        register_report(
+            fname,
+            int(match.group(1)) if match else None,
+            os.path.getsize(path),
+            created_at=datetime.utcfromtimestamp(os.path.getmtime(path)),
+        )
+    missing = known - on_disk
+    if missing:
+        ReportFile.query.filter(ReportFile.filename.in_(missing)).delete(synchronize_session=False)
+        db.session.commit()
+    return len(on_disk - known), len(missing)
+
+
+def enforce_retention(max_count=None, max_bytes=None, max_age_days=None, keep=()):
+    """
+    Evict reports, oldest first, beyond REPORT_MAX_COUNT files,
+    REPORT_MAX_BYTES in total or older than REPORT_MAX_AGE_DAYS (0 or None
+    disables a limit). Files named in `keep` (the report just rendered) are
+    never evicted. Evicted reports are simply rendered again if asked
+    for. Returns the evicted file names.
+    """
+    config = current_app.config
+    max_count = config.get("REPORT_MAX_COUNT") if max_count is None else max_count
+    max_bytes = config.get("REPORT_MAX_BYTES") if max_bytes is None else max_bytes
+    max_age_days = config.get("REPORT_MAX_AGE_DAYS") if max_age_days is None else max_age_days
+
+    evict = []
+    if max_age_days:
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+        evict += db.session.query(ReportFile.id, ReportFile.filename).filter(ReportFile.created_at < cutoff).all()
+    if max_count or max_bytes:
+        newest_first = (
+            db.session.query(ReportFile.id, ReportFile.filename, ReportFile.size_bytes)
+            .order_by(ReportFile.created_at.desc(), ReportFile.id.desc())
+        )
+        if max_age_days:
+            newest_first = newest_first.filter(ReportFile.created_at >= cutoff)
+        kept = total = 0
+        for report_id, fname, size in newest_first:
+            kept += 1
+            total += size
+            if (max_count and kept > max_count) or (max_bytes and total > max_bytes):
+                evict.append((report_id, fname))
 
-    with open(os.path.join(out_dir, fname), "w", encoding="utf-8") as fp:
-        fp.write(html)
+    evict = [(report_id, fname) for report_id, fname in evict if fname not in keep]
+    if not evict:
+        return []
+    for _, fname in evict:
+        try:
+            os.remove(report_path(fname))
+        except FileNotFoundError:
+            pass
+    ids = [report_id for report_id, _ in evict]
+    for i in range(0, len(ids), MAX_PARAMS):
+        ReportFile.query.filter(ReportFile.id.in_(ids[i:i + MAX_PARAMS])).delete(synchronize_session=False)
+    db.session.commit()
+    print(f"Evicted {len(evict)} saved reports")
+    return [fname for _, fname in evict]
 
+
+@reports_bp.get("/files")
+def api_list_reports():
+    """Saved reports, newest first; pass ?cursor=<next_cursor> for the next page."""
+    limit = max(1, min(request.args.get("limit", 20, type=int), 100))
+    cursor = request.args.get("cursor", type=int)
+
+    q = ReportFile.query.order_by(ReportFile.id.desc())
+    if cursor:
+        q = q.filter(ReportFile.id < cursor)
+    reports = q.limit(limit + 1).all()
+
+    page = reports[:limit]
     return jsonify({
-        "url": f"/api/reports/files/{fname}",
-        "report_id": fname
+        "reports": [r.to_dict() for r in page],
+        "next_cursor": page[-1].id if len(reports) > limit else None,
     })
 
 # -------------------------
 # Serve saved report files
 # -------------------------
+class HitCounter:
+    """
+    Report hit counts gathered in memory and written to report_files at
+    most every `interval` seconds, so serving a report is not a write.
+    Hits not yet flushed when the process exits are lost.
+    """
+
+    def __init__(self, interval=60):
+        self.interval = interval
+        self.counts = {}
+        self.last = {}
+        self.flushed_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def add(self, filename):
+        with self.lock:
+            self.counts[filename] = self.counts.get(filename, 0) + 1
+            self.last[filename] = datetime.utcnow()
+            due = time.monotonic() - self.flushed_at >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            counts, last, self.counts, self.last = self.counts, self.last, {}, {}
+            self.flushed_at = time.monotonic()
+        for filename, count in counts.items():
+            db.session.query(ReportFile).filter_by(filename=filename).update(
+                {"hits": ReportFile.hits + count, "last_hit_at": last[filename]}, synchronize_session=False
+            )
+        if counts:
+            db.session.commit()
+
+
+def init_report_hits(app):
+    app.extensions["report_hits"] = HitCounter(app.config.get("REPORT_HIT_FLUSH_INTERVAL", 60))
+
+
+def send_report(filename):
+    """Send a saved report (conditional GET included) and count the hit unless it was a 304."""
+    response = send_from_directory(os.path.join(current_app.instance_path, "reports"), filename)
+    if response.status_code == 200:
+        current_app.extensions["report_hits"].add(filename)
+    return response
+
+
 @reports_bp.route("/files/<filename>")
 def serve_report(filename):
-    out_dir = os.path.join(current_app.instance_path, "reports")
-    return send_from_directory(out_dir, filename)
\ No newline at end of file
+    return send_report(filename)
\ No newline at end of file
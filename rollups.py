@@ -0,0 +1,95 @@
+from sqlalchemy import delete, func, insert, select
+from db_helpers import upsert_add
+from cache import bump_data_version
+from models import db, Events, MonthlyRollup
+
+# type_id stored for events without an event type
+NO_TYPE = 0
+
+
+def event_snapshot(event):
+    """The fields of an event (ORM object or value dict) the rollup depends on."""
+    get = event.get if isinstance(event, dict) else lambda name: getattr(event, name)
+    return (get("year"), get("month"), get("type_id") or NO_TYPE, get("attendance") or 0)
+
+
+def apply_changes(removed=(), added=()):
+    """
+    Update the rollup for events leaving (`removed`) and entering (`added`)
+    the table, given as event_snapshot() tuples. Runs in the caller's
+    transaction; the caller commits.
+    """
+    deltas = {}
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for year, month, type_id, attendance in snapshots:
+            if year is None:
+                continue
+            count_delta, attendance_delta = deltas.get((year, month, type_id), (0, 0))
+            deltas[(year, month, type_id)] = (count_delta + sign, attendance_delta + sign * attendance)
+
+    rows = [
+        {"year": y, "month": m, "type_id": t, "event_count": c, "attendance_sum": a}
+        for (y, m, t), (c, a) in deltas.items() if c or a
+    ]
+    if not rows:
+        return
+    upsert_add(MonthlyRollup.__table__, rows, ["year", "month", "type_id"], ["event_count", "attendance_sum"])
+    if any(r["event_count"] < 0 for r in rows):
+        db.session.execute(delete(MonthlyRollup).where(MonthlyRollup.event_count <= 0))
+
+
+def record_change(before=None, after=None):
+    """Rollup bookkeeping for one event insert (after), update (both) or delete (before)."""
+    apply_changes(
+        removed=[before] if before else [],
+        added=[after] if after else [],
+    )
+
+
+def snapshots_for(event_ids):
+    """event_snapshot() tuples for events already in the DB."""
+    rows = db.session.query(
+        Events.year, Events.month, Events.type_id, Events.attendance
+    ).filter(Events.id.in_(event_ids))
+    return [(y, m, t or NO_TYPE, a or 0) for y, m, t, a in rows]
+
+
+def rebuild_statements():
+    return [delete(MonthlyRollup), insert(MonthlyRollup).from_select(
+        ["year", "month", "type_id", "event_count", "attendance_sum"],
+        select(
+            Events.year,
+            Events.month,
+            func.coalesce(Events.type_id, NO_TYPE),
+            func.count(Events.id),
+            func.coalesce(func.sum(Events.attendance), 0),
+        )
+        .where(Events.year.isnot(None))
+        .group_by(Events.year, Events.month, func.coalesce(Events.type_id, NO_TYPE)),
+    )]
+
+
+def rebuild_rollups():
+    """Recompute the whole rollup table from events (repair / first install)."""
+    for stmt in rebuild_statements():
+        db.session.execute(stmt)
+    bump_data_version()
+    db.session.commit()
+
+
+def monthly_totals(year=None):
+    """Rows of (month, event_count, total_attendance) for months with events."""
+    q = db.session.query(
+        MonthlyRollup.month.label("month"),
+        func.sum(MonthlyRollup.event_count).label("event_count"),
+        func.sum(MonthlyRollup.attendance_sum).label("total_attendance"),
+    )
+    if year:
+        q = q.filter(MonthlyRollup.year == year)
+    return q.group_by(MonthlyRollup.month).order_by(MonthlyRollup.month).all()
+
+
+def rollup_years():
+    """Years that have at least one event, read from the rollup's primary key."""
+    rows = db.session.query(MonthlyRollup.year).distinct().order_by(MonthlyRollup.year)
+    return [r.year for r in rows]
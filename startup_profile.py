@@ -0,0 +1,69 @@
+# Opt-in startup timing: with STARTUP_PROFILE=1, create_app() prints how long
+# each of its phases took and which module imports dominated worker boot.
+# app.py calls install() before any other import so every import made while
+# booting goes through the timer.
+import builtins
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+ENABLED = os.environ.get("STARTUP_PROFILE") == "1"
+
+_original_import = builtins.__import__
+_started = time.perf_counter()
+_stack = []
+# module name -> (cumulative seconds, self seconds)
+import_times = {}
+phase_times = []
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name in sys.modules:
+        return _original_import(name, globals, locals, fromlist, level)
+
+    start = time.perf_counter()
+    _stack.append(0.0)
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        import_times.setdefault(name, (elapsed, elapsed - children))
+
+
+def install():
+    """Start timing imports (no-op unless STARTUP_PROFILE=1)."""
+    if ENABLED and builtins.__import__ is _original_import:
+        builtins.__import__ = _timed_import
+
+
+@contextmanager
+def phase(name):
+    """Time one named step of create_app()."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        phase_times.append((name, time.perf_counter() - start))
+
+
+def report(top=15):
+    """Print the phase and import breakdown, then stop timing imports."""
+    if not ENABLED:
+        return
+    builtins.__import__ = _original_import
+
+    print(f"\n=== Startup profile (pid {os.getpid()}) ===")
+    print(f"total since first import: {(time.perf_counter() - _started) * 1000:8.1f} ms")
+    for name, seconds in phase_times:
+        print(f"  phase {name:<28} {seconds * 1000:8.1f} ms")
+
+    print(f"slowest imports (top {top}, cumulative / self):")
+    slowest = sorted(import_times.items(), key=lambda item: item[1][0], reverse=True)[:top]
+    for name, (cumulative, own) in slowest:
+        print(f"  {name:<40} {cumulative * 1000:8.1f} ms {own * 1000:8.1f} ms")
+    print()
+    phase_times.clear()
@@ -91,16 +91,42 @@ async function pickYearAndRun(actionFn) {
   closeBtn.addEventListener("click", closeModal);
 }
 
-// --- Report generation ---
+// --- Report generation (queued job, polled until the file is ready) ---
+// Polls for as long as the job's heartbeat keeps moving; the server counts a
+// job as dead after `timeout` seconds without one, so the client does too.
+const REPORT_POLL_MS = 1000;
+
+async function generateReport(year) {
+  const payload = year ? { year } : {};
+  let job = await fetchJSON(`${ORIGIN}/api/reports/jobs`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(payload),
+  });
+  const statusUrl = job.status_url;
+  let heartbeat = job.heartbeat_at;
+  let lastProgress = Date.now();
+  while (job.status === "queued" || job.status === "running") {
+    if (Date.now() - lastProgress > job.timeout * 1000) {
+      throw new Error("the report job stopped responding, please try again");
+    }
+    await new Promise(resolve => setTimeout(resolve, REPORT_POLL_MS));
+    job = await fetchJSON(`${ORIGIN}${statusUrl}`);
+    if (job.heartbeat_at !== heartbeat) {
+      heartbeat = job.heartbeat_at;
+      lastProgress = Date.now();
+    }
+  }
+  if (job.status !== "done") {
+    throw new Error(job.error || "report job " + job.status);
+  }
+  return job;
+}
+
 async function createReportWithYear(year, btn) {
   if (btn) btn.disabled = true;
   try {
-    const payload = year ? { year } : {};
-    const data = await fetchJSON(`${ORIGIN}/api/reports/generate`, {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload),
-    });
+    const data = await generateReport(year);
 
     // Open the HTML report to view
     window.open(data.url, "_blank", "noopener");
@@ -115,12 +141,7 @@ async function createReportWithYear(year, btn) {
 // --- "Download" report as PDF via browser print ---
 async function downloadReportWithYear(year) {
   try {
-    const payload = year ? { year } : {};
-    const data = await fetchJSON(`${ORIGIN}/api/reports/generate`, {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify(payload),
-    });
+    const data = await generateReport(year);
 
     // Take the returned report URL and add ?print=1
     const u = new URL(data.url, ORIGIN);
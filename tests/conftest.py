@@ -6,8 +6,11 @@ from app import create_app
 from models import db
 
 @pytest.fixture
-def app():
-    app = create_app(testing=True)
+def app(monkeypatch, tmp_path):
+    # The engine is built inside create_app, so the in-memory URL has to be
+    # in the environment before the app exists.
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///:memory:")
+    app = create_app(testing=True, instance_path=str(tmp_path))
     app.config.update({
         "TESTING": True,
         "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
@@ -21,4 +24,4 @@ def app():
 
 @pytest.fixture
 def client(app):
-    return app.test_client()
\ No newline at end of file
+    return app.test_client()
@@ -0,0 +1,53 @@
+from datetime import date
+import analytics
+from models import db, Events, Event_Type
+from rollups import rebuild_rollups
+
+
+def seed():
+    workshop, social = Event_Type(name="Workshop"), Event_Type(name="Social")
+    db.session.add_all([workshop, social])
+    db.session.flush()
+    db.session.add_all([
+        Events(title="A", date=date(2024, 1, 5), attendance=10, type_id=workshop.id),
+        Events(title="B", date=date(2024, 1, 9), attendance=5, type_id=social.id),
+        Events(title="C", date=date(2024, 3, 1), attendance=30, type_id=workshop.id),
+        Events(title="D", date=date(2024, 3, 2), type_id=workshop.id),
+        Events(title="E", date=date(2024, 3, 3), attendance=1, type_id=workshop.id),
+        Events(title="F", date=date(2023, 3, 1), attendance=7),
+    ])
+    db.session.commit()
+    rebuild_rollups()
+
+
+def test_compute_folds_months_and_categories(app):
+    seed()
+    stats = analytics.compute()
+
+    assert stats.months[0] == "January" and len(stats.months) == 12
+    assert stats.events[:3] == [2, 0, 4]
+    assert stats.attendance[:3] == [15, 0, 38]
+    assert stats.growth[:3] == [0, 0, 100.0]
+    assert stats.event_total == 6
+    assert stats.attendance_total == 53
+    assert stats.popular_month == 3
+    assert stats.categories == [
+        {"category": "Social", "count": 1, "percentage": 20.0},
+        {"category": "Workshop", "count": 4, "percentage": 80.0},
+    ]
+
+
+def test_compute_year_filter_and_empty_table(app):
+    assert analytics.compute().attendance_total is None
+    assert analytics.compute().categories == []
+
+    seed()
+    stats = analytics.compute(2023)
+    assert stats.events[2] == 1
+    assert stats.event_total == 1
+    assert stats.categories == []
+
+
+def test_top_events(app):
+    seed()
+    assert [e.attendance for e in analytics.top_events(2)] == [30, 10]
@@ -0,0 +1,171 @@
+from datetime import date
+from cache import ResponseCache, bump_data_version, data_version
+from models import db, Events
+
+
+def test_response_cache_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_response_cache_expires_entries(monkeypatch):
+    import cache as cache_module
+
+    now = [100.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.set("a", 1)
+    now[0] = 109.0
+    assert cache.get("a") == 1
+    now[0] = 111.0
+    assert cache.get("a") is None
+
+
+def test_cached_endpoint_served_until_data_changes(client, app):
+    assert client.get("/api/events/years").json == []
+
+    # Written behind the app's back: the cached response is still served
+    db.session.add(Events(title="Walk", date=date(2024, 5, 1)))
+    db.session.commit()
+    assert client.get("/api/events/years").json == []
+    assert client.get("/api/reports/events/years").json == [2024]
+
+    # Any write path that bumps the version invalidates it
+    client.delete(f"/api/v1/events/{Events.query.first().id}")
+    db.session.add(Events(title="Run", date=date(2025, 5, 1)))
+    db.session.commit()
+    assert client.get("/api/events/years").json == [2025]
+
+
+def test_loader_invalidates_cached_attendance(client, app):
+    from load_data import load_events
+
+    assert sum(client.get("/api/v1/attendance").json["events"]) == 0
+    version = data_version()
+    load_events(rows=[{
+        "Name of Event/Activity": "Yoga",
+        "Date": "25-Jul-24",
+        "Start Time": "9am",
+        "End Time": "10am",
+        "Attendance": "12",
+    }])
+    assert data_version() > version
+    assert client.get("/api/v1/attendance").json["attendance"][6] == 12
+
+
+def test_writes_in_one_worker_invalidate_another(monkeypatch, tmp_path):
+    from app import create_app
+
+    # Two apps on one database file stand in for two gunicorn workers
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'shared.db'}")
+    reader = create_app(testing=True, instance_path=str(tmp_path))
+    writer = create_app(testing=True, instance_path=str(tmp_path))
+
+    client = reader.test_client()
+    assert client.get("/api/events/years").json == []
+
+    with writer.app_context():
+        db.session.add(Events(title="Walk", date=date(2024, 5, 1)))
+        bump_data_version()
+        db.session.commit()
+
+    assert client.get("/api/events/years").json == [2024]
+
+
+def test_rolled_back_write_keeps_version(app):
+    before = data_version()
+    db.session.add(Events(title="Walk", date=date(2024, 5, 1)))
+    bump_data_version()
+    db.session.rollback()
+    assert data_version() == before
+
+
+def test_data_version_row_seeded_idempotently(app):
+    from migrations import seed_data_version
+    from models import DataVersion
+
+    db.session.query(DataVersion).delete()
+    db.session.commit()
+    bump_data_version()
+    db.session.commit()
+    assert db.session.get(DataVersion, 1).version == 1
+
+    # A second worker seeding after the row exists neither fails nor resets it
+    with db.engine.begin() as conn:
+        seed_data_version(conn)
+        seed_data_version(conn)
+    db.session.expire_all()
+    assert db.session.get(DataVersion, 1).version == 1
+
+
+def test_attendance_conditional_get(client, app):
+    first = client.get("/api/v1/attendance")
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    again = client.get("/api/v1/attendance", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    db.session.add(Events(title="Walk", date=date(2024, 5, 1), attendance=3))
+    bump_data_version()
+    db.session.commit()
+    changed = client.get("/api/v1/attendance", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_event_detail_conditional_get(client, app):
+    event = Events(title="Walk", date=date(2024, 5, 1))
+    db.session.add(event)
+    db.session.commit()
+
+    first = client.get(f"/api/v1/events/{event.id}")
+    etag = first.headers["ETag"]
+    assert client.get(f"/api/v1/events/{event.id}", headers={"If-None-Match": etag}).status_code == 304
+    since = client.get(f"/api/v1/events/{event.id}", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert since.status_code == 304
+
+    event.title = "Long walk"
+    db.session.commit()
+    changed = client.get(f"/api/v1/events/{event.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json["title"] == "Long walk"
+
+    assert client.get("/api/v1/events/99999").status_code == 404
+
+
+def test_sync_update_refreshes_updated_at(app):
+    from load_data import load_events, sync_events
+
+    row = {"Name of Event/Activity": "Yoga", "Date": "25-Jul-24", "Start Time": "9am", "End Time": "10am"}
+    load_events(rows=[row])
+    event = Events.query.one()
+    stamp = event.updated_at
+    assert stamp is not None
+
+    sync_events(rows=[dict(row, Attendance="5")])
+    db.session.refresh(event)
+    assert event.attendance == 5
+    assert event.updated_at > stamp
+
+
+def test_saved_reports_support_conditional_get(client, app):
+    import os
+
+    os.makedirs(os.path.join(app.instance_path, "reports"), exist_ok=True)
+    with open(os.path.join(app.instance_path, "reports", "r.html"), "w") as f:
+        f.write("<html></html>")
+
+    first = client.get("/api/reports/files/r.html")
+    assert first.headers["ETag"] and first.headers["Last-Modified"]
+    again = client.get("/api/reports/files/r.html", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    first.close()
+    again.close()
@@ -0,0 +1,32 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from db_helpers import insert_ignore, insert_ignore_stmt
+from models import db, Events, Organizer, event_organizers
+from datetime import date
+
+
+def test_insert_ignore_sqlite_syntax():
+    stmt = insert_ignore_stmt(event_organizers, [{"event_id": 1, "organizer_id": 2}], "sqlite")
+    sql = str(stmt.compile(dialect=sqlite.dialect()))
+    assert sql.startswith("INSERT OR IGNORE INTO event_organizers")
+
+
+def test_insert_ignore_postgres_syntax():
+    rows = [{"event_id": 1, "organizer_id": 2}, {"event_id": 1, "organizer_id": 3}]
+    stmt = insert_ignore_stmt(event_organizers, rows, "postgresql")
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT DO NOTHING" in sql
+    assert sql.count("(%(event_id_m") == 2  # one multi-values statement
+
+
+def test_insert_ignore_skips_duplicates(app):
+    event = Events(title="Linked", date=date(2024, 7, 25))
+    organizer = Organizer(name="SW")
+    db.session.add_all([event, organizer])
+    db.session.commit()
+
+    link = {"event_id": event.id, "organizer_id": organizer.id}
+    insert_ignore(event_organizers, [link, link])
+    insert_ignore(event_organizers, [link])
+    db.session.commit()
+
+    assert db.session.query(event_organizers).count() == 1
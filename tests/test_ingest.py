@@ -0,0 +1,66 @@
+import load_data
+from ingest import IngestLock, run_ingest
+from models import Events, IngestRun
+
+
+ROWS = [{
+    "Name of Event/Activity": "Yoga",
+    "Lead Organizer": "SW",
+    "Date": "25-Jul-24",
+    "Start Time": "9am",
+    "End Time": "10am",
+    "EventType": "Wellness",
+}]
+
+
+def test_run_ingest_records_progress(app, monkeypatch):
+    monkeypatch.setattr(load_data, "iter_sheet_rows", lambda: iter(ROWS))
+
+    run = run_ingest(app)
+
+    assert run.status == "done"
+    assert run.rows_loaded == 1
+    assert Events.query.count() == 1
+
+
+def test_run_ingest_skips_when_locked_or_loaded(app, monkeypatch):
+    monkeypatch.setattr(load_data, "iter_sheet_rows", lambda: iter(ROWS))
+
+    lock = IngestLock(app.instance_path)
+    assert lock.acquire()
+    try:
+        assert run_ingest(app) is None
+    finally:
+        lock.release()
+
+    run_ingest(app)
+    assert run_ingest(app, only_if_empty=True) is None
+    assert IngestRun.query.count() == 1
+
+
+def test_ingest_status_endpoint(client, app, monkeypatch):
+    assert client.get("/api/v1/ingest/status").json == {"status": "idle"}
+
+    monkeypatch.setattr(load_data, "iter_sheet_rows", lambda: iter(ROWS))
+    run_ingest(app)
+
+    data = client.get("/api/v1/ingest/status").json
+    assert data["status"] == "done"
+    assert data["rows_loaded"] == 1
+
+
+def test_interrupted_startup_import_is_resumed_with_sync(app, monkeypatch):
+    from models import db
+
+    monkeypatch.setattr(load_data, "iter_sheet_rows", lambda: iter(ROWS + [dict(ROWS[0], Date="26-Jul-24")]))
+    # A worker died after writing the first row
+    load_data.load_events(rows=ROWS)
+    db.session.add(IngestRun(mode="load", status="running", rows_loaded=1))
+    db.session.commit()
+
+    run = run_ingest(app, only_if_empty=True)
+
+    assert run.mode == "sync"
+    assert run.status == "done"
+    assert Events.query.count() == 2
+    assert IngestRun.query.order_by(IngestRun.id).first().status == "failed"
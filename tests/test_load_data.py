@@ -71,3 +71,265 @@ def test_load_data_skips_invalid_rows(app, monkeypatch):
     with app.app_context():
         # Should not raise
         load_events()
+
+
+def db_count(table):
+    from models import db
+    return db.session.query(table).count()
+
+
+def _row(title, **overrides):
+    row = {
+        "Name of Event/Activity": title,
+        "Lead Organizer": "SW, HR",
+        "Date": "25-Jul-24",
+        "Start Time": "9am",
+        "End Time": "12pm",
+        "Location": "Chace Forum",
+        "Attendance": "21",
+        "Partners": "Red Cross",
+        "Advertisement": "Posters, ColbyNow",
+        "EventType": "Workshop",
+    }
+    row.update(overrides)
+    return row
+
+
+def test_load_events_batches_and_caches_names(app):
+    from load_data import load_events
+    from models import Events, Event_Type, Organizer, event_organizers, event_partners
+
+    rows = [_row(f"Event {i}") for i in range(5)]
+    loaded = load_events(rows=rows, batch_size=2)
+
+    assert loaded == 5
+    assert Events.query.count() == 5
+    assert Event_Type.query.count() == 1
+    assert Organizer.query.count() == 2
+    assert db_count(event_organizers) == 10
+    assert db_count(event_partners) == 5
+
+    event = Events.query.filter_by(title="Event 0").first()
+    assert event.organizer_obj.name == "SW"
+    assert event.event_type.name == "Workshop"
+    assert [p.name for p in event.partners] == ["Red Cross"]
+
+
+def test_load_events_reports_failed_rows_individually(app, capsys):
+    from load_data import load_events
+    from models import Events
+
+    rows = [
+        _row("Good 1"),
+        _row("Too Big", Attendance="99999999999999999999999"),
+        _row("Good 2"),
+        _row("No Date", Date="Recurring"),
+    ]
+    loaded = load_events(rows=rows, batch_size=10)
+
+    out = capsys.readouterr().out
+    assert loaded == 2
+    assert {e.title for e in Events.query.all()} == {"Good 1", "Good 2"}
+    assert "Too Big" in out
+    assert "recurring" in out.lower()
+
+
+def test_sync_events_only_touches_changed_rows(app):
+    from load_data import load_events, sync_events
+    from models import Events, db
+
+    rows = [_row(f"Event {i}") for i in range(4)]
+    load_events(rows=rows)
+    before = {e.title: e.id for e in Events.query.all()}
+
+    rows[1] = _row("Event 1", Attendance="99")
+    rows[3] = _row("Event 4")
+    stats = sync_events(rows=rows)
+
+    assert stats["unchanged"] == 2
+    assert stats["updated"] == 1
+    assert stats["added"] == 1
+    assert stats["vanished"] == [before["Event 3"]]
+    assert db.session.get(Events, before["Event 1"]).attendance == 99
+
+    stats = sync_events(rows=rows, prune=True)
+    assert stats["unchanged"] == 4
+    assert stats["added"] == stats["updated"] == 0
+    assert db.session.get(Events, before["Event 3"]) is None
+
+
+def test_sync_events_adopts_events_loaded_before_sync(app):
+    from load_data import sync_events
+    from models import Events, ImportedRow, db
+
+    rows = [_row("Old Event")]
+    sync_events(rows=rows)
+    db.session.query(ImportedRow).delete()
+    db.session.commit()
+
+    stats = sync_events(rows=rows)
+    assert stats["updated"] == 1
+    assert stats["added"] == 0
+    assert Events.query.count() == 1
+
+
+def test_iter_csv_rows_reads_every_file_lazily():
+    import types
+    from load_data import iter_csv_rows, DATA_DIR
+
+    rows = iter_csv_rows(DATA_DIR)
+    assert isinstance(rows, types.GeneratorType)
+
+    rows = list(rows)
+    assert len(rows) == 78
+    assert all("" not in row for row in rows)
+    assert any(row["Date"] == "November 6-7, 2024" for row in rows)
+
+
+def test_iter_csv_rows_normalizes_header_variants(tmp_path):
+    from load_data import iter_csv_rows, parse_row
+
+    (tmp_path / "a.csv").write_text(
+        "Name of Event/Activity,Date,Start Time,End Time,Partners,Event Type,,\n"
+        "Yoga,25-Jul-24,9am,10am,Red Cross; CER,Wellness,,\n"
+    )
+    (tmp_path / "b.csv").write_text(
+        "Name of Event/Activity,Date,Start Time,End Time,Partners,EventType\n"
+        "Walk,26-Jul-24,9am,10am,Red Cross,Wellness\n"
+    )
+
+    rows = list(iter_csv_rows(str(tmp_path / "*.csv")))
+    assert [r["EventType"] for r in rows] == ["Wellness", "Wellness"]
+    assert parse_row(rows[0]).partners == ("Red Cross", "CER")
+
+
+def test_sheet_rows_from_fixture_backend(app, tmp_path):
+    import json
+    from load_data import iter_sheet_rows
+
+    (tmp_path / "Fall.json").write_text(json.dumps({"values": [
+        ["Name of Event/Activity", "Date", "Start Time", "End Time"],
+        ["Yoga", "25-Jul-24", "9am"],
+    ]}))
+    (tmp_path / "Spring.json").write_text(json.dumps([
+        ["Name of Event/Activity", "Date"],
+        ["Walk", "26-Jul-24", "ignored extra cell"],
+    ]))
+    app.config["GOOGLE_SHEETS_FIXTURES"] = str(tmp_path)
+    app.config["GOOGLE_SHEETS_TABS"] = "Fall, Spring, Empty"
+
+    rows = list(iter_sheet_rows())
+    assert rows == [
+        {"Name of Event/Activity": "Yoga", "Date": "25-Jul-24", "Start Time": "9am", "End Time": ""},
+        {"Name of Event/Activity": "Walk", "Date": "26-Jul-24"},
+    ]
+
+
+def test_sheet_headers_are_normalized_like_csv(tmp_path):
+    from load_data import iter_csv_rows, rows_from_values
+
+    values = [
+        ["Name of Event", " Event  Type", "Date", "", ""],
+        ["Yoga", "Wellness", "25-Jul-24", "", ""],
+    ]
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text("\n".join(",".join(r) for r in values) + "\n")
+
+    rows = list(rows_from_values(values))
+    assert rows == [{"Name of Event/Activity": "Yoga", "EventType": "Wellness", "Date": "25-Jul-24"}]
+    assert rows == list(iter_csv_rows(str(csv_path)))
+
+
+def test_google_tabs_use_one_batch_get(monkeypatch):
+    import load_data
+
+    calls = []
+
+    class FakeValues:
+        def batchGet(self, spreadsheetId, ranges):
+            calls.append(ranges)
+            return self
+
+        def execute(self):
+            return {"valueRanges": [{"values": [["A"], ["1"]]}, {}]}
+
+    class FakeService:
+        def spreadsheets(self):
+            return self
+
+        def values(self):
+            return FakeValues()
+
+    monkeypatch.setattr(load_data, "sheets_service", lambda creds: FakeService())
+    tabs = list(load_data.fetch_google_tabs({}, "sheet", ["One", "Two"]))
+
+    assert calls == [["One", "Two"]]
+    assert tabs == [("One", [["A"], ["1"]]), ("Two", [])]
+
+
+def test_parse_time_fast_path_edges():
+    assert parse_time("12am").hour == 0
+    assert parse_time("12pm").hour == 12
+    assert parse_time("03:05PM").minute == 5
+    assert parse_time("0pm") is None
+    assert parse_time("3:75pm") is None
+
+
+def test_parse_flexible_date_fast_path_edges():
+    assert parse_flexible_date("07-Nov-23").isoformat() == "2023-11-07"
+    assert parse_flexible_date("november 6, 2024").isoformat() == "2024-11-06"
+    assert parse_flexible_date("30-Feb-24") is None
+    assert parse_flexible_date("Recurring") is None
+
+
+def test_parse_rows_process_pool_matches_serial():
+    from load_data import parse_rows
+
+    rows = [_row(f"Event {i}") for i in range(30)] + [_row("Bad", Date="soon")]
+    serial = list(parse_rows(rows))
+    parallel = list(parse_rows(rows, workers=2, chunksize=4))
+
+    assert parallel == serial
+    assert serial[-1][0] == 31
+    assert serial[-1][1] is None
+
+
+def test_validate_rows_dry_run_reports_without_writing(app):
+    from load_data import validate_rows
+    from models import Events
+
+    report = validate_rows(rows=[_row("Good"), _row("Bad", **{"Start Time": "Various"})])
+
+    assert report["valid"] == 1
+    assert report["skipped"] == [(2, "Skipping row due to invalid time: Various or 12pm")]
+    assert Events.query.count() == 0
+
+
+def test_sync_does_not_prune_when_rows_fail_to_parse(app):
+    from load_data import load_events, sync_events
+    from models import Events
+
+    rows = [_row("Event 0"), _row("Event 1")]
+    load_events(rows=rows)
+
+    rows[1] = _row("Event 1", **{"Start Time": "TBD"})
+    stats = sync_events(rows=rows, prune=True)
+
+    assert stats["skipped"] == 1
+    assert Events.query.filter_by(title="Event 1").count() == 1
+
+
+def test_load_events_skips_rows_already_imported(app, capsys):
+    from load_data import load_events
+    from models import Events
+
+    rows = [_row(f"Event {i}") for i in range(3)]
+    assert load_events(rows=rows) == 3
+
+    rows.append(_row("Event 3"))
+    assert load_events(rows=rows) == 1
+
+    out = capsys.readouterr().out
+    assert "Skipping row" not in out
+    assert "3 rows were already imported" in out
+    assert Events.query.count() == 4
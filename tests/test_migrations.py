@@ -0,0 +1,61 @@
+from sqlalchemy import inspect, text
+from migrations import upgrade_schema
+from models import db
+
+
+def test_upgrade_schema_adds_and_backfills_date_parts(app):
+    db.session.execute(text("DROP INDEX ix_events_year_month"))
+    db.session.execute(text("ALTER TABLE events DROP COLUMN month"))
+    db.session.execute(text("ALTER TABLE events DROP COLUMN year"))
+    db.session.execute(text("INSERT INTO events (title, date) VALUES ('Old', '2023-10-25')"))
+    db.session.commit()
+
+    upgrade_schema()
+
+    inspector = inspect(db.engine)
+    assert {"year", "month"} <= {c["name"] for c in inspector.get_columns("events")}
+    assert "ix_events_year_month" in {i["name"] for i in inspector.get_indexes("events")}
+    row = db.session.execute(text("SELECT year, month FROM events WHERE title = 'Old'")).one()
+    assert tuple(row) == (2023, 10)
+
+
+def test_year_filter_uses_index(app):
+    plan = db.session.execute(
+        text("EXPLAIN QUERY PLAN SELECT month, count(*) FROM events WHERE year = 2024 GROUP BY month")
+    ).all()
+    assert "ix_events_year_month" in " ".join(str(r[-1]) for r in plan)
+
+
+def test_concurrent_upgrades_run_once(monkeypatch, tmp_path):
+    import threading
+    from app import create_app
+    from models import MonthlyRollup
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'legacy.db'}")
+    app = create_app(testing=True, instance_path=str(tmp_path))
+    with app.app_context():
+        db.session.execute(text("DROP INDEX ix_events_year_month"))
+        db.session.execute(text('ALTER TABLE events DROP COLUMN "month"'))
+        db.session.execute(text('ALTER TABLE events DROP COLUMN "year"'))
+        db.session.execute(text("DELETE FROM monthly_rollups"))
+        db.session.execute(text("INSERT INTO events (title, date) VALUES ('Old', '2023-10-25')"))
+        db.session.commit()
+
+    errors = []
+
+    def boot():
+        try:
+            with app.app_context():
+                upgrade_schema()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=boot) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with app.app_context():
+        assert [(r.month, r.event_count) for r in MonthlyRollup.query.all()] == [(10, 1)]
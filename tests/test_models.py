@@ -11,4 +11,14 @@ def test_password_hashing(app):
     u = User(name="Test", email="test2@example.com", position="Staff")
     u.set_password("password123")
     assert u.check_password("password123")
-    assert not u.check_password("wrongpassword")
\ No newline at end of file
+    assert not u.check_password("wrongpassword")
+
+def test_event_date_sets_year_and_month(app):
+    from datetime import date
+    from models import Events
+
+    e = Events(title="Yoga", date=date(2024, 7, 25))
+    assert (e.year, e.month) == (2024, 7)
+
+    e.date = date(2025, 1, 3)
+    assert (e.year, e.month) == (2025, 1)
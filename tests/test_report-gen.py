@@ -33,3 +33,275 @@ def test_generate_report_fallback(client):
 def test_generate_report_no_year(client):
     response = client.post("/api/reports/generate", json={})
     assert response.status_code == 200
+
+
+def test_generate_report_reuses_unchanged_report(client, app, monkeypatch):
+    import os
+    from datetime import date
+    import report_gen
+    from cache import bump_data_version
+    from models import db, Events
+
+    renders = []
+    render = report_gen.render_report
+    monkeypatch.setattr(report_gen, "render_report", lambda year: renders.append(year) or render(year))
+
+    first = client.post("/api/reports/generate", json={"year": 2024}).json
+    again = client.post("/api/v1/reports/generate", json={"year": 2024}).json
+    assert again["report_id"] == first["report_id"]
+    assert (first["cached"], again["cached"]) == (False, True)
+    assert renders == [2024]
+    assert client.get(again["url"]).status_code == 200
+
+    db.session.add(Events(title="Walk", date=date(2024, 5, 1)))
+    bump_data_version()
+    db.session.commit()
+    changed = client.post("/api/reports/generate", json={"year": 2024}).json
+    assert changed["report_id"] != first["report_id"]
+
+    monkeypatch.setattr(report_gen, "template_version", lambda: "edited")
+    assert client.post("/api/reports/generate", json={"year": 2024}).json["cached"] is False
+    assert len(renders) == 3
+    assert not [f for f in os.listdir(os.path.join(app.instance_path, "reports")) if f.endswith(".tmp")]
+
+
+def test_report_aggregates_come_from_sql(app):
+    from datetime import date
+    from models import db, Events, Event_Type
+    from report_gen import count_by_type, read_events, render_report
+    from rollups import rebuild_rollups
+
+    workshop = Event_Type(name="Workshop")
+    db.session.add(workshop)
+    db.session.flush()
+    db.session.add_all([
+        Events(title="Yoga", date=date(2024, 2, 1), attendance=4, type_id=workshop.id),
+        Events(title="Walk", date=date(2024, 1, 1), attendance=6, type_id=workshop.id),
+        Events(title="Mystery", date=date(2023, 3, 1)),
+    ])
+    db.session.commit()
+    rebuild_rollups()
+
+    assert count_by_type() == [("Unknown", 1), ("Workshop", 2)]
+    assert count_by_type(2024) == [("Workshop", 2)]
+
+    rows = read_events(2024)
+    assert [(r.title, r.type, r.attendance) for r in rows] == [("Walk", "Workshop", 6), ("Yoga", "Workshop", 4)]
+
+    html = "".join(render_report(2024))
+    assert "Events Report 2024" in html and "Mystery" not in html
+    html = "".join(render_report(1990))
+    assert "Showing all years" in html and "Mystery" in html
+
+
+def test_report_is_streamed_to_disk(app):
+    import os
+    from datetime import date
+    from sqlalchemy import insert
+    from models import db, Events
+    from report_gen import generate_report_file, read_events, render_report
+    from rollups import rebuild_rollups
+
+    db.session.execute(insert(Events), [
+        {"title": f"Event {i}", "date": date(2024, 1, 1), "year": 2024, "month": 1} for i in range(2500)
+    ])
+    db.session.commit()
+    rebuild_rollups()
+
+    assert not isinstance(read_events(), list)
+    assert not isinstance(render_report(None), str)
+
+    fname, _ = generate_report_file(None)
+    with open(os.path.join(app.instance_path, "reports", fname), encoding="utf-8") as fp:
+        html = fp.read()
+    assert "Events (first 2500)" in html
+    assert html.count("<tr>") == 2501
+
+
+def test_report_jobs_run_and_coalesce(client, app, monkeypatch):
+    queue = app.extensions["report_jobs"]
+    started = []
+    monkeypatch.setattr(queue, "_start", started.append)
+
+    first = client.post("/api/reports/jobs", json={"year": 2024})
+    again = client.post("/api/reports/jobs", json={"year": 2024})
+    assert first.status_code == again.status_code == 202
+    assert first.json["id"] == again.json["id"]
+    assert first.json["status"] == "queued" and first.json["url"] is None
+    assert len(started) == 1
+
+    queue.run(started[0])
+    status = client.get(first.json["status_url"]).json
+    assert status["status"] == "done"
+    assert client.get(status["url"]).status_code == 200
+
+    # Done and still on disk: answered at once with the same job
+    done = client.post("/api/reports/jobs", json={"year": 2024})
+    assert done.status_code == 200
+    assert done.json["id"] == first.json["id"]
+    assert client.get("/api/reports/jobs/999").status_code == 404
+
+
+def test_report_job_failure_is_reported(client, app, monkeypatch):
+    import report_gen
+
+    def broken(year, heartbeat=None):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(report_gen, "generate_report_file", broken)
+    app.extensions["report_jobs"].workers = 0
+
+    job = client.post("/api/reports/jobs", json={}).json
+    status = client.get(job["status_url"]).json
+    assert status["status"] == "failed"
+    assert status["error"] == "disk full"
+
+
+def _write_report(app, name, size=10, age_days=0):
+    import os
+    import time
+
+    out_dir = os.path.join(app.instance_path, "reports")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, name)
+    with open(path, "w") as fp:
+        fp.write("x" * size)
+    stamp = time.time() - age_days * 86400
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def test_report_index_listing_and_hits(client, app):
+    from report_gen import index_report_dir
+
+    for i in range(5):
+        _write_report(app, f"report_202{i}_abc.html", age_days=5 - i)
+    assert index_report_dir() == (5, 0)
+
+    page = client.get("/api/reports/files?limit=2").json
+    assert [r["year"] for r in page["reports"]] == [2024, 2023]
+    rest = client.get(f"/api/reports/files?limit=10&cursor={page['next_cursor']}").json
+    assert [r["year"] for r in rest["reports"]] == [2022, 2021, 2020]
+    assert rest["next_cursor"] is None
+
+    assert client.get("/api/reports/files?limit=0").json["reports"][0]["year"] == 2024
+    assert len(client.get("/api/reports/files?limit=-1").json["reports"]) == 1
+
+    first = client.get("/api/reports/files/report_2024_abc.html")
+    first.close()
+    client.get("/api/v1/reports/files/report_2024_abc.html").close()
+    client.get(
+        "/api/reports/files/report_2024_abc.html", headers={"If-None-Match": first.headers["ETag"]}
+    ).close()
+    # Counted in memory, not by the request; 304s are not hits
+    assert client.get("/api/reports/files?limit=1").json["reports"][0]["hits"] == 0
+    app.extensions["report_hits"].flush()
+    assert client.get("/api/reports/files?limit=1").json["reports"][0]["hits"] == 2
+
+
+def test_retention_evicts_oldest_reports(app):
+    import os
+    from models import ReportFile
+    from report_gen import enforce_retention, index_report_dir
+
+    paths = [_write_report(app, f"report_all_{i}.html", size=100, age_days=40 - i * 10) for i in range(4)]
+    index_report_dir()
+
+    # 40 days old is past the age limit
+    assert enforce_retention(max_count=0, max_bytes=0, max_age_days=35) == ["report_all_0.html"]
+    # 3 left, newest first: keep 2 by count
+    assert enforce_retention(max_count=2, max_bytes=0, max_age_days=0) == ["report_all_1.html"]
+    # 2 left of 100 bytes each: 150 bytes keeps only the newest
+    assert enforce_retention(max_count=0, max_bytes=150, max_age_days=0) == ["report_all_2.html"]
+
+    assert [os.path.exists(p) for p in paths] == [False, False, False, True]
+    assert [r.filename for r in ReportFile.query.all()] == ["report_all_3.html"]
+
+
+def test_new_reports_are_indexed_and_capped(client, app):
+    from cache import bump_data_version
+    from models import db, ReportFile
+
+    app.config.update(REPORT_MAX_COUNT=2, REPORT_MAX_BYTES=0, REPORT_MAX_AGE_DAYS=0)
+    names = []
+    for _ in range(3):
+        names.append(client.post("/api/reports/generate", json={}).json["report_id"])
+        bump_data_version()
+        db.session.commit()
+
+    indexed = {r.filename: r for r in ReportFile.query.all()}
+    assert set(indexed) == set(names[1:])
+    assert all(r.size_bytes > 0 and r.data_version is not None for r in indexed.values())
+    assert client.get(f"/api/reports/files/{names[0]}").status_code == 404
+
+
+def test_prune_reports_command(app):
+    _write_report(app, "report_2020_old.html", age_days=100)
+    _write_report(app, "report_2024_new.html")
+
+    result = app.test_cli_runner().invoke(args=["prune-reports", "--max-age-days", "30"])
+    assert result.exit_code == 0, result.output
+    assert "2 added" in result.output and "1 evicted" in result.output
+
+
+def test_orphaned_report_job_is_requeued(client, app, monkeypatch):
+    from datetime import datetime, timedelta
+    from models import ReportJob, db
+
+    queue = app.extensions["report_jobs"]
+    started = []
+    monkeypatch.setattr(queue, "_start", started.append)
+
+    job_id = client.post("/api/reports/jobs", json={"year": 2024}).json["id"]
+    # The worker that picked it up dies mid-render
+    db.session.get(ReportJob, job_id).status = "running"
+    db.session.commit()
+    assert client.post("/api/reports/jobs", json={"year": 2024}).json["status"] == "running"
+    assert started == [job_id]
+
+    db.session.get(ReportJob, job_id).heartbeat_at = datetime.utcnow() - timedelta(seconds=queue.timeout + 1)
+    db.session.commit()
+    again = client.post("/api/reports/jobs", json={"year": 2024}).json
+    assert again["id"] == job_id and again["status"] == "queued"
+    assert started == [job_id, job_id]
+
+    queue.run(job_id)
+    db.session.expire_all()
+    assert client.get(f"/api/reports/jobs/{job_id}").json["status"] == "done"
+    assert db.session.get(ReportJob, job_id).active_key is None
+
+
+def test_new_report_survives_its_own_retention_pass(client, app):
+    app.config.update(REPORT_MAX_COUNT=0, REPORT_MAX_BYTES=1, REPORT_MAX_AGE_DAYS=0)
+
+    url = client.post("/api/reports/generate", json={}).json["url"]
+    assert client.get(url).status_code == 200
+
+
+def test_rendering_job_keeps_its_pool_alive(client, app, monkeypatch):
+    from datetime import datetime, timedelta
+    from models import ReportJob, db
+
+    queue = app.extensions["report_jobs"]
+    started = []
+    monkeypatch.setattr(queue, "_start", started.append)
+    running = client.post("/api/reports/jobs", json={"year": 2024}).json["id"]
+    waiting = client.post("/api/reports/jobs", json={"year": 2023}).json["id"]
+    queue.waiting.add(waiting)
+
+    old = datetime.utcnow() - timedelta(hours=1)
+    for job_id in (running, waiting):
+        db.session.get(ReportJob, job_id).heartbeat_at = old
+    db.session.commit()
+
+    queue.timeout = 0  # beat on every chunk written
+    queue.run(running)
+
+    db.session.expire_all()
+    assert db.session.get(ReportJob, running).status == "done"
+    assert db.session.get(ReportJob, waiting).heartbeat_at > old
+
+    # Still waiting in a live pool: joined, not queued a second time
+    queue.timeout = 600
+    assert client.post("/api/reports/jobs", json={"year": 2023}).json["id"] == waiting
+    assert started == [running, waiting]
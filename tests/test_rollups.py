@@ -0,0 +1,76 @@
+from datetime import date
+from load_data import load_events, sync_events
+from models import db, Events, Event_Type, Organizer, MonthlyRollup
+from rollups import rebuild_rollups
+
+
+def rollup_rows():
+    return sorted(
+        (r.year, r.month, r.type_id, r.event_count, r.attendance_sum)
+        for r in MonthlyRollup.query.all()
+    )
+
+
+def assert_matches_rebuild():
+    maintained = rollup_rows()
+    rebuild_rollups()
+    assert maintained == rollup_rows()
+
+
+def _row(title, date_cell, attendance, event_type="Wellness"):
+    return {
+        "Name of Event/Activity": title,
+        "Date": date_cell,
+        "Start Time": "9am",
+        "End Time": "10am",
+        "Attendance": attendance,
+        "EventType": event_type,
+    }
+
+
+def test_loader_and_sync_maintain_rollups(app):
+    rows = [
+        _row("A", "25-Jul-24", "10"),
+        _row("B", "26-Jul-24", "5"),
+        _row("C", "3-Mar-25", "", event_type=""),
+    ]
+    load_events(rows=rows)
+    assert rollup_rows() == [(2024, 7, 1, 2, 15), (2025, 3, 0, 1, 0)]
+    assert_matches_rebuild()
+
+    rows[1] = _row("B", "26-Jul-24", "7", event_type="Workshop")
+    sync_events(rows=rows[1:], prune=True)
+    assert_matches_rebuild()
+    assert (2024, 7, 1, 1, 10) not in rollup_rows()
+
+
+def test_views_maintain_rollups(client, app):
+    event_type = Event_Type(name="Wellness")
+    organizer = Organizer(name="SW")
+    db.session.add_all([event_type, organizer])
+    db.session.commit()
+
+    form = {
+        "title": "Yoga", "date": "2024-07-25", "location": "Spa", "attendance": "12",
+        "description": "", "lead_organizer": str(organizer.id), "type_id": str(event_type.id),
+    }
+    client.post("/api/v1/add_event", data=form)
+    assert rollup_rows() == [(2024, 7, event_type.id, 1, 12)]
+
+    event_id = Events.query.first().id
+    client.post(f"/api/v1/events/{event_id}", data=dict(form, date="2024-08-01", attendance="20"))
+    assert rollup_rows() == [(2024, 8, event_type.id, 1, 20)]
+
+    client.delete(f"/api/v1/events/{event_id}")
+    assert rollup_rows() == []
+
+
+def test_attendance_api_reads_rollups(client, app):
+    db.session.add(Events(title="Walk", date=date(2024, 2, 3), attendance=9))
+    db.session.commit()
+    rebuild_rollups()
+
+    data = client.get("/api/v1/attendance?year=2024").json
+    assert data["attendance"][1] == 9
+    assert data["events"][1] == 1
+    assert sum(client.get("/api/v1/attendance?year=2023").json["events"]) == 0
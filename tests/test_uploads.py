@@ -0,0 +1,152 @@
+import io
+import os
+from datetime import date
+from werkzeug.datastructures import FileStorage
+from models import db, Events, ProcessedFile
+from uploads import PosterUploader, get_uploader
+
+
+def upload(name, data=b"data"):
+    return FileStorage(io.BytesIO(data), filename=name)
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.uploaded = []
+
+    def upload(self, path, filename, digest):
+        with open(path, "rb") as f:
+            self.uploaded.append((filename, f.read()))
+        return f"https://cdn.example/{filename}"
+
+
+def make_event():
+    event = Events(title="Walk", date=date(2024, 5, 1))
+    db.session.add(event)
+    db.session.commit()
+    return event
+
+
+def test_upload_poster_is_queued_and_attached(client, app):
+    # Inline: the in-memory test DB is one connection shared by all threads
+    get_uploader().workers = 0
+    event = make_event()
+
+    response = client.post(
+        f"/api/v1/upload_poster/{event.id}",
+        data={"poster": (io.BytesIO(b"png bytes"), "walk.png")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 202
+    get_uploader().wait()
+
+    db.session.refresh(event)
+    assert event.poster_url.startswith("/api/v1/posters/")
+    assert ProcessedFile.query.filter_by(event_id=event.id).one().filename == f"{event.id}/walk.png"
+    assert client.get(event.poster_url).data == b"png bytes"
+    assert os.listdir(os.path.join(app.instance_path, "spool")) == []
+
+
+def test_upload_poster_errors(client, app):
+    assert client.post("/api/v1/upload_poster/1").status_code == 400
+    response = client.post(
+        "/api/v1/upload_poster/999",
+        data={"poster": (io.BytesIO(b"x"), "x.png")},
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 404
+
+
+def test_pool_runs_uploads_with_pluggable_backend(monkeypatch, tmp_path):
+    from app import create_app
+
+    # A file DB so the pool threads get their own connections
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'uploads.db'}")
+    app = create_app(testing=True, instance_path=str(tmp_path))
+    backend = RecordingBackend()
+
+    with app.app_context():
+        event = make_event()
+        uploader = PosterUploader(app, backend, workers=2, max_pending=2)
+        futures = [uploader.enqueue(event.id, upload(f"p{i}.png", b"data %d" % i)) for i in range(3)]
+        uploader.wait()
+
+        assert [f.result() for f in futures] == [f"https://cdn.example/p{i}.png" for i in range(3)]
+        assert sorted(name for name, _ in backend.uploaded) == ["p0.png", "p1.png", "p2.png"]
+        db.session.refresh(event)
+        assert event.poster_url.startswith("https://cdn.example/p")
+
+
+def test_failed_upload_leaves_event_untouched(app):
+    class BrokenBackend:
+        def upload(self, path, filename, digest):
+            raise RuntimeError("network down")
+
+    event = make_event()
+    future = PosterUploader(app, BrokenBackend(), workers=0, retries=0).enqueue(event.id, upload("p.png"))
+
+    assert isinstance(future.exception(), RuntimeError)
+    assert db.session.get(Events, event.id).poster_url is None
+
+
+def test_identical_posters_are_uploaded_once(app):
+    backend = RecordingBackend()
+    uploader = PosterUploader(app, backend, workers=0)
+    events = [make_event() for _ in range(3)]
+
+    uploader.enqueue(events[0].id, upload("default_poster.jpeg", b"same"))
+    uploader.enqueue(events[1].id, upload("renamed.jpeg", b"same"))
+    uploader.enqueue(events[2].id, upload("default_poster.jpeg", b"different"))
+
+    assert [name for name, _ in backend.uploaded] == ["default_poster.jpeg", "default_poster.jpeg"]
+    urls = [db.session.get(Events, e.id).poster_url for e in events]
+    assert urls[0] == urls[1] == "https://cdn.example/default_poster.jpeg"
+    files = ProcessedFile.query.order_by(ProcessedFile.event_id).all()
+    assert [f.filename for f in files] == [
+        f"{events[0].id}/default_poster.jpeg",
+        f"{events[1].id}/renamed.jpeg",
+        f"{events[2].id}/default_poster.jpeg",
+    ]
+    assert files[0].content_hash == files[1].content_hash != files[2].content_hash
+
+
+def test_reupload_replaces_the_events_poster_row(app):
+    backend = RecordingBackend()
+    uploader = PosterUploader(app, backend, workers=0)
+    event = make_event()
+
+    uploader.enqueue(event.id, upload("a.png", b"one"))
+    uploader.enqueue(event.id, upload("a.png", b"two"))
+
+    db.session.expire_all()
+    row = ProcessedFile.query.filter_by(event_id=event.id).one()
+    assert len(backend.uploaded) == 2
+    assert backend.uploaded[-1] == ("a.png", b"two")
+    assert row.poster_url == db.session.get(Events, event.id).poster_url
+
+
+def test_failed_upload_is_retried_then_kept_for_restart(app):
+    class FlakyBackend(RecordingBackend):
+        failures = 5
+
+        def upload(self, path, filename, digest):
+            if self.failures:
+                self.failures -= 1
+                raise RuntimeError("network down")
+            return super().upload(path, filename, digest)
+
+    backend = FlakyBackend()
+    event = make_event()
+    uploader = PosterUploader(app, backend, workers=0, retries=2, backoff=0)
+
+    # 3 attempts, all failing: the spooled file survives
+    assert isinstance(uploader.enqueue(event.id, upload("p.png", b"poster")).exception(), RuntimeError)
+    spool = os.path.join(app.instance_path, "spool")
+    assert len(os.listdir(spool)) == 1
+
+    # After a restart the leftover upload is resumed (2 more failures, then success)
+    assert uploader.resume_spooled() == 1
+    assert backend.uploaded == [("p.png", b"poster")]
+    db.session.expire_all()
+    assert db.session.get(Events, event.id).poster_url == "https://cdn.example/p.png"
+    assert os.listdir(spool) == []
@@ -42,4 +42,74 @@ def test_events_page_empty_db(client, app):
         db.session.commit()
 
     response = client.get("/events")
-    assert response.status_code == 200
\ No newline at end of file
+    assert response.status_code == 200
+
+def count_queries(app, fn):
+    from sqlalchemy import event
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements)
+
+
+def test_events_list_query_count_is_constant(app):
+    from load_data import load_events
+    from views import getEventsList
+
+    def rows(start, count):
+        return [{
+            "Name of Event/Activity": f"Event {i}",
+            "Date": "25-Jul-24",
+            "Start Time": "9am",
+            "End Time": "10am",
+            "Lead Organizer": "SW",
+            "Partners": "Red Cross; CER",
+            "EventType": "Workshop",
+        } for i in range(start, start + count)]
+
+    load_events(rows=rows(0, 3))
+    few = count_queries(app, getEventsList)
+    load_events(rows=rows(3, 30))
+    db.session.expire_all()
+    many = count_queries(app, getEventsList)
+
+    events = getEventsList()
+    assert len(events) == 33
+    assert events[0]["partners"] == "Red Cross, CER"
+    assert events[0]["lead_organizer"] == "SW"
+    assert few == many <= 2
+
+
+def test_events_page_keyset_pagination_and_filters(client, app):
+    from models import Event_Type
+    from rollups import rebuild_rollups
+
+    app.config["EVENTS_PAGE_SIZE"] = 2
+    workshop, social = Event_Type(name="Workshop"), Event_Type(name="Social")
+    db.session.add_all([workshop, social])
+    db.session.flush()
+    for i, day in enumerate([date(2024, 1, 5), date(2024, 1, 5), date(2024, 3, 1), date(2023, 6, 1)]):
+        db.session.add(Events(title=f"Event {i}", date=day, type_id=(social if i == 1 else workshop).id))
+    db.session.commit()
+    rebuild_rollups()
+
+    first = client.get("/api/v1/events").data.decode()
+    assert "Event 2" in first and "Event 1" in first and "Event 0" not in first
+    assert "cursor=2024-01-05_2" in first
+
+    second = client.get("/api/v1/events?cursor=2024-01-05_2").data.decode()
+    assert "Event 0" in second and "Event 3" in second and "Event 1" not in second
+    assert "Older events" not in second
+
+    filtered = client.get("/api/v1/events?year=2024&category=Workshop").data.decode()
+    assert "Event 2" in filtered and "Event 0" in filtered
+    assert "Event 1" not in filtered and "Event 3" not in filtered
+    assert '<option value="2023"' in filtered
+
+    assert client.get("/api/v1/events?cursor=garbage").status_code == 400
@@ -0,0 +1,268 @@
+# Poster uploads happen off the request thread: the view spools the file to
+# <instance>/spool and returns, and a small thread pool pushes it to the
+# configured backend (Cloudinary, or a local directory for dev/tests) and then
+# fills in Events.poster_url and the ProcessedFile row. Files are hashed while
+# they are spooled, and a poster whose sha256 is already known reuses the
+# stored URL without another upload. A spool file is only deleted once its
+# upload succeeded; failed uploads are retried with backoff and anything still
+# spooled at the next start is uploaded again.
+import hashlib
+import os
+import shutil
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from werkzeug.utils import secure_filename
+from models import db, Events, ProcessedFile
+from cache import bump_data_version
+
+CHUNK_SIZE = 64 * 1024
+
+
+def cloudinary_uploader():
+    """Import and configure Cloudinary on first upload rather than at boot."""
+    import cloudinary
+    import cloudinary.uploader
+
+    if not cloudinary.config().api_key and current_app.config.get("CLOUDINARY_API_KEY"):
+        cloudinary.config(
+            cloud_name=current_app.config["CLOUDINARY_CLOUD_NAME"],
+            api_key=current_app.config["CLOUDINARY_API_KEY"],
+            api_secret=current_app.config["CLOUDINARY_API_SECRET"],
+        )
+    return cloudinary.uploader
+
+
+class CloudinaryBackend:
+    def upload(self, path, filename, digest):
+        # Naming the asset by its digest makes Cloudinary itself idempotent
+        return cloudinary_uploader().upload(path, public_id=digest, overwrite=False)["secure_url"]
+
+
+def local_poster_dir():
+    return os.path.join(current_app.instance_path, "posters")
+
+
+class LocalBackend:
+    """Copies posters into <instance>/posters, served by views.serve_poster."""
+
+    base_url = "/api/v1/posters/"
+
+    def upload(self, path, filename, digest):
+        directory = local_poster_dir()
+        os.makedirs(directory, exist_ok=True)
+        name = digest + os.path.splitext(filename)[1].lower()
+        shutil.copyfile(path, os.path.join(directory, name))
+        return self.base_url + name
+
+
+def make_backend(app):
+    backend = app.config.get("POSTER_BACKEND") or (
+        "cloudinary" if app.config.get("CLOUDINARY_API_KEY") else "local"
+    )
+    if backend == "cloudinary":
+        return CloudinaryBackend()
+    if backend == "local":
+        return LocalBackend()
+    raise ValueError(f"Unknown POSTER_BACKEND: {backend}")
+
+
+class PosterUploader:
+    """
+    Spool + bounded worker pool. At most `workers` uploads run at once and at
+    most `max_pending` may be queued; beyond that enqueue() blocks, so a burst
+    of uploads cannot exhaust memory or disk. workers=0 uploads inline.
+    A failing backend upload is retried `retries` times, waiting `backoff`
+    seconds and doubling it after each attempt.
+    """
+
+    def __init__(self, app, backend=None, workers=2, max_pending=32, retries=3, backoff=1.0):
+        self.app = app
+        self.backend = backend
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.slots = threading.BoundedSemaphore(max_pending)
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.executor = None  # created on first use so it is never inherited across fork
+
+    @property
+    def spool_dir(self):
+        return os.path.join(self.app.instance_path, "spool")
+
+    def enqueue(self, event_id, file_storage):
+        """
+        Save the uploaded file to the spool and schedule its upload. A file
+        already uploaded before is attached right away. Returns a Future.
+        """
+        filename = secure_filename(file_storage.filename) or "poster"
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, f"{event_id}_{uuid.uuid4().hex}_{filename}")
+        digest = spool_file(file_storage, path)
+
+        known_url = find_poster_url(digest)
+        if known_url:
+            future = Future()
+            try:
+                os.remove(path)
+                attach_poster(event_id, filename, known_url, digest)
+                future.set_result(known_url)
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        return self._submit(event_id, path, filename, digest)
+
+    def resume_spooled(self):
+        """
+        Re-enqueue posters left in the spool by failed uploads or a restart.
+        Each file is claimed by renaming it first, so when several workers
+        boot at once only one of them takes it. Returns the number resumed.
+        """
+        if not os.path.isdir(self.spool_dir):
+            return 0
+        resumed = 0
+        for name in sorted(os.listdir(self.spool_dir)):
+            event_id, _, rest = name.partition("_")
+            filename = rest.partition("_")[2]
+            if not event_id.isdigit() or not filename or name.endswith(".part"):
+                continue
+            claimed = os.path.join(self.spool_dir, f"{event_id}_{uuid.uuid4().hex}_{filename}")
+            try:
+                os.rename(os.path.join(self.spool_dir, name), claimed)
+            except FileNotFoundError:
+                continue
+            self._submit(int(event_id), claimed, filename, hash_file(claimed))
+            resumed += 1
+        if resumed:
+            print(f"Resuming {resumed} spooled poster upload(s)")
+        return resumed
+
+    def _submit(self, event_id, path, filename, digest):
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(self._upload(event_id, path, filename, digest))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self.slots.acquire()
+        with self.lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="poster-upload")
+            future = self.executor.submit(self._upload, event_id, path, filename, digest)
+            self.pending.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self.lock:
+            self.pending.discard(future)
+        self.slots.release()
+
+    def _upload(self, event_id, path, filename, digest):
+        try:
+            with self.app.app_context():
+                # An identical file may have finished uploading while this one waited
+                url = find_poster_url(digest)
+                if url is None:
+                    url = self._upload_with_retry(path, filename, digest)
+                attach_poster(event_id, filename, url, digest)
+        except Exception:
+            print(f"Poster upload for event {event_id} failed; {path} is kept for the next start:")
+            traceback.print_exc()
+            raise
+        if os.path.exists(path):
+            os.remove(path)
+        return url
+
+    def _upload_with_retry(self, path, filename, digest):
+        backend = self.backend or make_backend(self.app)
+        for attempt in range(self.retries + 1):
+            try:
+                return backend.upload(path, filename, digest)
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt
+                print(f"Uploading poster {filename} failed ({e}); retrying in {delay:g}s")
+                time.sleep(delay)
+
+    def wait(self):
+        """Block until every queued upload has finished (tests, benchmarks, shutdown)."""
+        with self.lock:
+            futures = list(self.pending)
+        for future in futures:
+            future.exception()
+
+
+def spool_file(file_storage, path):
+    """
+    Copy an upload to `path` in chunks, returning its sha256 hex digest.
+    The file only appears under its final name once complete, so a restart
+    never resumes a half-written poster.
+    """
+    digest = hashlib.sha256()
+    with open(path + ".part", "wb") as out:
+        for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            out.write(chunk)
+    os.replace(path + ".part", path)
+    return digest.hexdigest()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_poster_url(digest):
+    """URL of an already uploaded file with this sha256, if any (uses the hash index)."""
+    return (
+        db.session.query(ProcessedFile.poster_url)
+        .filter(ProcessedFile.content_hash == digest, ProcessedFile.poster_url.isnot(None))
+        .limit(1)
+        .scalar()
+    )
+
+
+def attach_poster(event_id, filename, url, digest):
+    """Point the event at its uploaded poster and record the file."""
+    event = db.session.get(Events, event_id)
+    if event is None:
+        print(f"Event {event_id} was deleted before its poster finished uploading")
+        return
+
+    event.poster_url = url
+    processed_file = ProcessedFile.query.filter_by(event_id=event_id).first()
+    if processed_file is None:
+        processed_file = ProcessedFile(event=event)
+        db.session.add(processed_file)
+    processed_file.filename = f"{event_id}/{filename}"
+    processed_file.content_hash = digest
+    processed_file.poster_url = url
+    processed_file.processed_at = datetime.utcnow()
+    bump_data_version()
+    db.session.commit()
+
+
+def init_uploads(app):
+    app.extensions["poster_uploader"] = PosterUploader(
+        app,
+        workers=app.config.get("POSTER_UPLOAD_WORKERS", 2),
+        max_pending=app.config.get("POSTER_UPLOAD_MAX_PENDING", 32),
+        retries=app.config.get("POSTER_UPLOAD_RETRIES", 3),
+        backoff=app.config.get("POSTER_UPLOAD_BACKOFF", 1.0),
+    )
+
+
+def get_uploader():
+    return current_app.extensions["poster_uploader"]
@@ -1,17 +1,21 @@
-from models import ProcessedFile, db, Events, Event_Type, Organizer
+from models import ProcessedFile, ImportedRow, db, Events, Event_Type, Organizer, Partners, event_partners
 from flask import Blueprint, render_template
 from flask_login import login_required
 from flask_login import current_user
-from sqlalchemy import extract, func
+from sqlalchemy import and_, or_
 from datetime import datetime
-import cloudinary.uploader
 from calendar import month_name
 from flask import request, redirect, url_for, current_app, render_template, jsonify, send_from_directory
-from report_gen import read_events, summarize
-import os
+from report_gen import generate_report_file, parse_year, send_report
+from ingest import latest_run
+from rollups import event_snapshot, record_change, rollup_years
+import analytics
+from uploads import get_uploader, local_poster_dir
+from cache import cached, bump_data_version, conditional_on_data_version, not_modified, set_validators
 
 main_blueprint = Blueprint('homepage', __name__)
-    
+
+
 @main_blueprint.route("/")
 def home():
     """Landing route: show dashboard if logged in, else sign-in page."""
@@ -22,131 +26,88 @@ def home():
 
 @main_blueprint.route('/api/v1/dashboard')
 @login_required
+@cached
 def dashboard():
-    results = (db.session.query(
-        extract('month', Events.date).label('month'),
-        func.count(Events.id).label('event_count'),
-        func.sum(Events.attendance).label('total_attendance')
-    ).group_by('month').order_by('month').all()
-    )
+    stats = analytics.compute()
 
-    attendance_total = db.session.query(
-        func.sum(Events.attendance)
-    ).scalar()
-
-    event_total = db.session.query(
-        func.count(Events.id)
-    ).scalar()
-
-    months = [datetime(1900,int(r.month),1).strftime('%B') for r in results]
-    attendance = [r.total_attendance or 0 for r in results]
-    total_events = [r.event_count for r in results]
-   
-    percent_growth = []
-    for i in range(len(total_events)):
-        if i == 0:
-            percent_growth.append(0)
-        else:
-            prev = total_events[i-1]
-            curr = total_events[i]
-            if prev == 0:
-                percent_growth.append(0)
-            else:
-                percent_growth.append(round((curr-prev)/prev * 100, 2))
-
-    # Ensure all 12 months are shown in the dashboard even if no data is present
-    all_months = list(month_name)[1:] 
-    month_to_attendance = dict(zip(months, attendance))
-    month_to_growth = dict(zip(months, percent_growth))
-
-    attendance_twelve_months = [month_to_attendance.get(m, 0) for m in all_months]
-    growth_twelve_months = [month_to_growth.get(m, 0) for m in all_months]
-
-# ---- Event category percentage breakdown ----
-    category_results = (
-        db.session.query(
-            Event_Type.name.label("category"),
-            func.count(Events.id).label("count")
-        )
-        .join(Events, Events.type_id == Event_Type.id)
-        .group_by(Event_Type.name)
-        .all()
-    )
-
-    total_event_count = sum(r.count for r in category_results)
-
-    category_percentages = [
+    suggestions = [
         {
-            "category": r.category,
-            "count": r.count,
-            "percentage": round((r.count / total_event_count) * 100, 2) if total_event_count else 0
+            "event_type": e.category,
+            "day": e.date.day,
+            "month": month_name[e.date.month]
         }
-        for r in category_results
+        for e in analytics.top_events(4)
     ]
 
-  # --- Suggest top 4 upcoming events ---
-    popular_month = (
-        db.session.query(
-            extract('month', Events.date).label('month'),
-            func.sum(Events.attendance).label('total_attendance')
-        )
-        .group_by('month')
-        .order_by(func.sum(Events.attendance).desc())
-        .first()
+    return render_template('dashboard.html', months=stats.months, attendance=stats.attendance, growth=stats.growth, category_percentages=stats.categories, suggestions=suggestions, attendance_total = stats.attendance_total, event_total = stats.event_total)
+
+def partner_names_by_event(event_ids=None):
+    """Map event id -> partner names, fetched in one query for the whole list."""
+    rows = (
+        db.session.query(event_partners.c.event_id, Partners.name)
+        .join(Partners, Partners.id == event_partners.c.partner_id)
+        .order_by(event_partners.c.event_id, Partners.id)
     )
+    if event_ids is not None:
+        rows = rows.filter(event_partners.c.event_id.in_(event_ids))
+    names = {}
+    for event_id, name in rows:
+        names.setdefault(event_id, []).append(name)
+    return names
 
-    suggested_month = popular_month.month if popular_month else datetime.now().month
 
-    top_events = (
-        db.session.query(
-            Events.id,
-            Events.date,
-            Event_Type.name.label('category'),
-            Events.attendance
-        )
-        .join(Event_Type, Events.type_id == Event_Type.id)
-        .order_by(Events.attendance.desc())
-        .limit(4)
-        .all()
-    )
+def encode_cursor(event):
+    return f"{event['date'].isoformat()}_{event['id']}"
 
-    suggestions = [
-        {
-            "event_type": e.category,
-            "day": e.date.day,
-            "month": month_name[e.date.month]
-        }
-        for e in top_events
-    ]
 
-    # print(suggestions)
+def decode_cursor(cursor):
+    """'<YYYY-MM-DD>_<id>' -> (date, id); raises ValueError when malformed."""
+    day, _, event_id = cursor.partition("_")
+    return datetime.strptime(day, "%Y-%m-%d").date(), int(event_id)
 
-    return render_template('dashboard.html', months=all_months, attendance=attendance_twelve_months, growth=growth_twelve_months, category_percentages=category_percentages, suggestions=suggestions, attendance_total = attendance_total, event_total = event_total)
 
-def getEventsList():
-    events = (
-        db.session.query(Events, Organizer)
+def getEventsList(year=None, type_name=None, after=None, limit=None):
+    """
+    Events newest first, optionally filtered by year / event type name and
+    paged by keyset: `after` is the (date, id) of the last row already shown.
+    Always two queries (events, then their partners) however many rows match.
+    """
+    q = (
+        db.session.query(
+            Events.id, Events.title, Events.date, Events.location, Events.attendance,
+            Events.description, Events.poster_url, Event_Type.name, Organizer.name,
+        )
         .outerjoin(Organizer, Organizer.id == Events.lead_organizer)
         .join(Event_Type, Events.type_id == Event_Type.id)
-        .order_by(Events.date.desc())
-        .all()
     )
+    if year:
+        q = q.filter(Events.year == year)
+    if type_name:
+        q = q.filter(Event_Type.name == type_name)
+    if after:
+        after_date, after_id = after
+        q = q.filter(or_(
+            Events.date < after_date,
+            and_(Events.date == after_date, Events.id < after_id),
+        ))
+
+    events = q.order_by(Events.date.desc(), Events.id.desc()).limit(limit).all()
+    partners = partner_names_by_event([e[0] for e in events] if limit else None)
 
     event_list = []
-    for e, organizer in events:
-        partner_names = [p.name for p in e.partners] if e.partners else []
-
+    for (event_id, title, date, location, attendance, description,
+         poster_url, type_name, organizer_name) in events:
         event_list.append({
-            "id": e.id,
-            "title": e.title,
-            "date": e.date,
-            "type_name": e.event_type.name,
-            "location": e.location,
-            "attendance": e.attendance,
-            "description": e.description,
-            "lead_organizer": organizer.name if organizer else "N/A",
-            "partners": ", ".join(partner_names),
-            "poster_url": e.poster_url
+            "id": event_id,
+            "title": title,
+            "date": date,
+            "type_name": type_name,
+            "location": location,
+            "attendance": attendance,
+            "description": description,
+            "lead_organizer": organizer_name or "N/A",
+            "partners": ", ".join(partners.get(event_id, [])),
+            "poster_url": poster_url
         })
     
     return event_list
@@ -163,38 +124,43 @@ def delete_event(event_id):
     
     for f in files:
         db.session.delete(f)
+
+    ImportedRow.query.filter_by(event_id=event.id).delete()
+    record_change(before=event_snapshot(event))
         
     db.session.delete(event)
+    bump_data_version()
     db.session.commit()
     
     return jsonify({"message": "success, deleted"}), 200
 
 @main_blueprint.route('/api/v1/events')
 def events_page():
-    curEventList = getEventsList()
-    years = sorted({ event["date"].year for event in curEventList if event.get("date") is not None })
     specific_year = request.args.get("year", type=int)
-
+    category = request.args.get("category") or None
+    cursor = request.args.get("cursor")
+    page_size = current_app.config.get("EVENTS_PAGE_SIZE", 50)
+
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "invalid cursor"}), 400
+
+    # One extra row tells us whether there is a next page
+    curEventList = getEventsList(year=specific_year, type_name=category, after=after, limit=page_size + 1)
+    next_cursor = None
+    if len(curEventList) > page_size:
+        curEventList = curEventList[:page_size]
+        next_cursor = encode_cursor(curEventList[-1])
+
+    years = rollup_years()
     organizers = Organizer.query.all()
     event_types = Event_Type.query.all()
     
-    if specific_year:
-        curEventList = [event for event in curEventList if event.get("date") is not None and event["date"].year == specific_year]
-    
     # Get event category counts
-    category_results = (
-        db.session.query(
-            Event_Type.name.label("category"),
-            func.count(Events.id).label("count")
-        )
-        .join(Events, Events.type_id == Event_Type.id)
-        .group_by(Event_Type.name)
-        .all()
-    )
-
-    categories = [{"name": r.category, "count": r.count} for r in category_results]
+    categories = [{"name": c["category"], "count": c["count"]} for c in analytics.compute().categories]
         
-    return render_template('event.html', events=curEventList,years=years,categories=categories,specific_year=specific_year, organizers=organizers, event_types=event_types)
+    return render_template('event.html', events=curEventList,years=years,categories=categories,specific_year=specific_year, category=category, cursor=cursor, next_cursor=next_cursor, organizers=organizers, event_types=event_types)
 
 @main_blueprint.route("/events")
 def events_page_alias():
@@ -204,12 +170,20 @@ def events_page_alias():
 
 @main_blueprint.route('/api/v1/events/<int:event_id>', methods=['GET'])
 def get_event(event_id):
-    event = Events.query.get(event_id)
+    # Answer unchanged polls from updated_at alone, before loading the event
+    updated_at = db.session.query(Events.updated_at).filter_by(id=event_id).scalar()
+    etag = f"event-{event_id}-{updated_at:%Y%m%d%H%M%S%f}" if updated_at else None
+    if etag:
+        response = not_modified(etag, updated_at)
+        if response:
+            return response
+
+    event = db.session.get(Events, event_id)
     
     if not event:
         return jsonify({"error": "event not found"}) ,404
     
-    return jsonify({
+    response = jsonify({
         "id": event.id,
         "title": event.title,
         "date": event.date.strftime("%Y-%m-%d"),
@@ -219,6 +193,9 @@ def get_event(event_id):
         "description" : event.description,
         "lead_organizer" : event.lead_organizer    
     })
+    if etag:
+        set_validators(response, etag, updated_at)
+    return response
   
 @main_blueprint.route('/profile')
 @login_required
@@ -233,76 +210,20 @@ def profile():
     return render_template('profile.html', user_name=user_name, user_email=user_email, user_position=user_position)
 
 @main_blueprint.route('/report')
+@cached
 def report_page():
     # Get all events
     curEventList = getEventsList()
-
-    # ---- Aggregate attendance by month ----
-    results = (
-        db.session.query(
-            extract('month', Events.date).label('month'),
-            func.count(Events.id).label('event_count'),
-            func.sum(Events.attendance).label('total_attendance')
-        )
-        .group_by('month')
-        .order_by('month')
-        .all()
-    )
-
-    months = [datetime(1900, int(r.month), 1).strftime('%B') for r in results]
-    attendance = [r.total_attendance or 0 for r in results]
-    total_events = [r.event_count for r in results]
-
-    # Compute percent growth in events month-to-month
-    percent_growth = []
-    for i in range(len(total_events)):
-        if i == 0:
-            percent_growth.append(0)
-        else:
-            prev = total_events[i-1]
-            curr = total_events[i]
-            if prev == 0:
-                percent_growth.append(0)
-            else:
-                percent_growth.append(round((curr - prev)/prev * 100, 2))
-
-    # Ensure all 12 months are included
-    all_months = list(month_name)[1:]
-    month_to_attendance = dict(zip(months, attendance))
-    month_to_growth = dict(zip(months, percent_growth))
-
-    attendance_twelve_months = [month_to_attendance.get(m, 0) for m in all_months]
-    growth_twelve_months = [month_to_growth.get(m, 0) for m in all_months]
-
-    # ---- Event category percentage breakdown ----
-    category_results = (
-        db.session.query(
-            Event_Type.name.label("category"),
-            func.count(Events.id).label("count")
-        )
-        .join(Events, Events.type_id == Event_Type.id)
-        .group_by(Event_Type.name)
-        .all()
-    )
-
-    total_event_count = sum(r.count for r in category_results)
-    category_percentages = [
-        {
-            "category": r.category,
-            "count": r.count,
-            "percentage": round((r.count / total_event_count) * 100, 2) if total_event_count else 0
-        }
-        for r in category_results
-    ]
+    stats = analytics.compute()
 
     # Render the report page
     return render_template(
         'report.html',
         events=curEventList,
-        months=all_months,
-        attendance=attendance_twelve_months,
-        growth=growth_twelve_months,
-        category_percentages=category_percentages
+        months=stats.months,
+        attendance=stats.attendance,
+        growth=stats.growth,
+        category_percentages=stats.categories
     )
 
     
@@ -328,20 +249,14 @@ def add_event():
         type_id=type_id
     )
     db.session.add(new_event)
+    record_change(after=event_snapshot(new_event))
+    bump_data_version()
     db.session.commit()  # Commit first so event has an ID
 
-    # --- Handle poster upload ---
+    # --- Handle poster upload (finishes in the background) ---
     poster_file = request.files.get('file_upload')
     if poster_file and poster_file.filename != "":
-        upload_result = cloudinary.uploader.upload(poster_file)
-        new_event.poster_url = upload_result["secure_url"]
-
-        processed_file = ProcessedFile(
-            filename=poster_file.filename,
-            event=new_event
-        )
-        db.session.add(processed_file)
-        db.session.commit()
+        get_uploader().enqueue(new_event.id, poster_file)
 
     return redirect(url_for('homepage.events_page'))
 
@@ -352,6 +267,8 @@ def update_event(event_id):
     if not event:
         return jsonify({"error": "event not found"}), 404
 
+    before = event_snapshot(event)
+
     # --- Update event fields ---
     event.title = request.form.get('title')
     event.date = datetime.strptime(request.form.get('date'), "%Y-%m-%d")
@@ -360,26 +277,16 @@ def update_event(event_id):
     event.description = request.form.get('description')
     event.lead_organizer = int(request.form.get('lead_organizer'))
     event.type_id = int(request.form.get('type_id'))
+    record_change(before=before, after=event_snapshot(event))
 
-    # --- Handle poster upload ---
+    bump_data_version()
+    db.session.commit()
+
+    # --- Handle poster upload (finishes in the background) ---
     poster_file = request.files.get('file_upload')
     if poster_file and poster_file.filename != "":
-        upload_result = cloudinary.uploader.upload(poster_file)
-        event.poster_url = upload_result["secure_url"]
-
-        # Check if a ProcessedFile already exists for this event
-        processed_file = ProcessedFile.query.filter_by(event_id=event.id).first()
-        if processed_file:
-            processed_file.filename = poster_file.filename
-        else:
-            new_file = ProcessedFile(
-                filename=poster_file.filename,
-                event=event
-            )
-            db.session.add(new_file)
+        get_uploader().enqueue(event.id, poster_file)
 
-
-    db.session.commit()
     return redirect(url_for('homepage.events_page'))
 
 
@@ -387,79 +294,29 @@ def update_event(event_id):
 @main_blueprint.post('/api/v1/reports/generate')
 def generate_report():
     payload = request.get_json(silent=True) or {}
-    y = payload.get("year")
-
-    year = int(y) if isinstance(y, (int, str)) and str(y).isdigit() else None
-
-    rows = read_events(year)
-    fallback_used = False
-
-    if year and not rows:
-        rows = read_events(None)
-        fallback_used = True
-
-    summary = summarize(rows)
-
-    title = f"Events Report {year}" if year and not fallback_used else "Events Report (All Years)"
-    note = "" if (year and not fallback_used) else (
-        f"<p style='color:#6b7280'>No rows found for {year}. Showing all years.</p>" if year else ""
-    )
-
-    # Chart prep
-    by_month = summary["by_month"]
-    months = list(by_month.keys())
-    attendance = [by_month[m]["events"] for m in months]
-
-    type_counts = {}
-    for r in rows:
-        t = r["type"] or "Unknown"
-        type_counts[t] = type_counts.get(t, 0) + 1
-
-    js_pie_labels = list(type_counts.keys())
-    js_pie_values = list(type_counts.values())
-
-
-    html = render_template(
-        "standalone_report.html",   
-        title=title,
-        note=note,
-        summary=summary,
-        rows=rows,
-        months=months,
-        attendance=attendance,   
-        js_pie_labels=js_pie_labels,
-        js_pie_values=js_pie_values,
-    )
-
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    fname = f"report_{year if year else 'all'}_{ts}.html"
-
-    out_dir = os.path.join(current_app.instance_path, "reports")
-    os.makedirs(out_dir, exist_ok=True)
-
-    path = os.path.join(out_dir, fname)
-    with open(path, "w", encoding="utf-8") as fp:
-        fp.write(html)
+    fname, reused = generate_report_file(parse_year(payload.get("year")))
 
     return jsonify({
         "report_id": fname,
-        "url": f"/reports/files/{fname}",
-        "format": "html"
+        "url": url_for('homepage.serve_report', filename=fname),
+        "format": "html",
+        "cached": reused
     })
 
 @main_blueprint.route('/api/v1/reports/files/<filename>')
 def serve_report(filename):
-    out_dir = os.path.join(current_app.instance_path, "reports")
-    return send_from_directory(out_dir, filename)
+    return send_report(filename)
 
 @main_blueprint.get('/api/events/years')
+@cached
 def api_get_years():
     """
     Return a JSON list of distinct years that have events in the DB,
     e.g. [2023, 2024, 2025].
     """
     years = (
-        db.session.query(extract('year', Events.date).label('year'))
+        db.session.query(Events.year.label('year'))
+        .filter(Events.year.isnot(None))
         .group_by('year')
         .order_by('year')
         .all()
@@ -468,44 +325,40 @@ def api_get_years():
     return jsonify(year_list)
 
 @main_blueprint.get('/api/v1/attendance')
+@conditional_on_data_version
+@cached
 def api_attendance_by_year():
     # Optional year filter
     year = request.args.get("year", type=int)
-
-    query = db.session.query(
-        extract('month', Events.date).label('month'),
-        func.sum(Events.attendance).label('total_attendance'),
-        func.count(Events.id).label('event_count')
-    )
-
-    if year:
-        query = query.filter(extract('year', Events.date) == year)
-
-    results = query.group_by('month').order_by('month').all()
-
-    # Ensure all 12 months are present
-    all_months = list(month_name)[1:]
-    month_to_attendance = {datetime(1900,int(r.month),1).strftime('%B'): r.total_attendance or 0 for r in results}
-    month_to_count = {datetime(1900,int(r.month),1).strftime('%B'): r.event_count or 0 for r in results}
-
-    attendance_twelve_months = [month_to_attendance.get(m, 0) for m in all_months]
-    count_twelve_months = [month_to_count.get(m, 0) for m in all_months]
+    stats = analytics.compute(year)
 
     return jsonify({
-        "months": all_months,
-        "attendance": attendance_twelve_months,
-        "events": count_twelve_months
+        "months": stats.months,
+        "attendance": stats.attendance,
+        "events": stats.events
     })
 
-@main_blueprint.get('/api/v1/upload_poster/<int:event_id>')
+@main_blueprint.get('/api/v1/ingest/status')
+def ingest_status():
+    """Progress of the most recent sheet/CSV import (any worker)."""
+    run = latest_run()
+    if not run:
+        return jsonify({"status": "idle"})
+    return jsonify(run.to_dict())
+
+@main_blueprint.post('/api/v1/upload_poster/<int:event_id>')
 def upload_poster(event_id):
-    file = request.files['poster']
-    upload_result = cloudinary.uploader.upload(file)
-    event = Events.query.get(event_id)
+    """Accept a poster for an event; the upload itself happens in the background."""
+    file = request.files.get('poster')
+    if not file or file.filename == "":
+        return jsonify({"error": "no poster file"}), 400
+    if not db.session.get(Events, event_id):
+        return jsonify({"error": "event not found"}), 404
 
-    poster_url = upload_result["secure_url"]
-    event = Events.query.get(event_id)
-    event.poster_url = poster_url
-    db.session.commit()
+    get_uploader().enqueue(event_id, file)
+    return jsonify({"message": "poster upload queued"}), 202
 
-    return redirect(url_for('event_detail', event_id=event_id))
+@main_blueprint.route('/api/v1/posters/<filename>')
+def serve_poster(filename):
+    """Posters stored by the local upload backend."""
+    return send_from_directory(local_poster_dir(), filename)